@@ -0,0 +1,348 @@
+from array import array
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # NumPy is optional, and only needed for NumPy buffers (to_numpy and from_edges of NumPy arrays)
+
+
+# Compressed sparse row (CSR) representation of a digraph
+#  * the vertices are relabeled to the ids 0..n-1, and labels[v] is the (original) label of vertex id v
+#  * the successors of vertex v are targets[offsets[v]:offsets[v + 1]]
+#  * offsets (n+1 entries) and targets (m entries) are array('i') buffers (4 bytes per entry), so a graph takes
+#    about 4 bytes per edge and 4 bytes per vertex (plus the label map), instead of a dict entry and a list per
+#    vertex and a (boxed) int per edge of the dict-of-lists representation
+#  * the traversals below mark the explored vertices in a bytearray (1 byte per vertex) instead of a dict
+# NOTE: The traversals take and return vertex ids (use g.ids[label] and g.labels[v] to translate)
+class CsrGraph:
+    def __init__(self, offsets, targets, labels=None):
+        self.offsets = offsets
+        self.targets = targets
+        if labels is None:
+            # the labels are the ids (a range maps every id to itself, without a dict)
+            self.labels = self.ids = range(len(offsets) - 1)
+        else:
+            self.labels = labels
+            self.ids = {label: v for v, label in enumerate(labels)}
+
+    @property
+    def num_vertices(self):
+        return len(self.offsets) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    def successors(self, v):
+        return self.targets[self.offsets[v]:self.offsets[v + 1]]
+
+    # the graph with all arcs reversed (vertex ids and labels are unchanged)
+    def reversed(self):
+        offsets = self.offsets
+        tails = array('i', bytes(4 * len(self.targets)))
+        for v in range(self.num_vertices):
+            for i in range(offsets[v], offsets[v + 1]):
+                tails[i] = v
+        return CsrGraph.from_edges(self.targets, tails, self.num_vertices, self.labels)
+
+    # zero-copy NumPy views of the offsets and targets
+    def to_numpy(self):
+        return np.frombuffer(self.offsets, dtype=np.int32), np.frombuffer(self.targets, dtype=np.int32)
+
+    # convert a dict-of-lists graph (vertices that only appear as successors are given ids after the keys)
+    @classmethod
+    def from_dict(cls, graph):
+        labels = list(graph)
+        ids = {label: v for v, label in enumerate(labels)}
+        for v in graph:
+            for w in graph[v]:
+                if w not in ids:
+                    ids[w] = len(labels)
+                    labels.append(w)
+        offsets = array('i', [0])
+        targets = array('i')
+        for label in labels:
+            targets.extend(ids[w] for w in graph.get(label, ()))
+            offsets.append(len(targets))
+        return cls(offsets, targets, labels)
+
+    # build the graph of the arcs (tails[i], heads[i]) between the vertex ids 0..n-1 (a counting sort by tail)
+    # NOTE: the successors of every vertex keep the order of the arcs
+    @classmethod
+    def from_edges(cls, tails, heads, n, labels=None):
+        if np is not None and isinstance(tails, np.ndarray):
+            return cls._from_numpy_edges(tails, heads, n, labels)
+        offsets = array('i', bytes(4 * (n + 1)))
+        for t in tails:
+            offsets[t + 1] += 1
+        for v in range(n):
+            offsets[v + 1] += offsets[v]
+        next_index = array('i', offsets)
+        targets = array('i', bytes(4 * len(heads)))
+        for t, h in zip(tails, heads):
+            targets[next_index[t]] = h
+            next_index[t] += 1
+        return cls(offsets, targets, labels)
+
+    @classmethod
+    def _from_numpy_edges(cls, tails, heads, n, labels):
+        order = np.argsort(tails, kind='stable')
+        offsets = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum(np.bincount(tails, minlength=n), out=offsets[1:])
+        return cls(array('i', offsets.tobytes()), array('i', heads[order].astype(np.int32).tobytes()), labels)
+
+
+# Load an edge list file with one arc 'tail head' per line (e.g. the SCC.txt data from the book website)
+# NOTE: The labels are the integers of the file, and the ids are given in order of first appearance
+def load_edge_list(filename):
+    ids = {}
+    labels = []
+    tails = array('i')
+    heads = array('i')
+    with open(filename) as fp:
+        for line in fp:
+            fields = line.split()
+            if len(fields) < 2:
+                continue
+            for field, ends in zip(fields, (tails, heads)):
+                label = int(field)
+                v = ids.get(label)
+                if v is None:
+                    v = ids[label] = len(labels)
+                    labels.append(label)
+                ends.append(v)
+    return CsrGraph.from_edges(tails, heads, len(labels), labels)
+
+
+# returns the dict {label: value} of all vertices with a value (not equal to missing)
+def label_map(g, values, missing=-1):
+    return {g.labels[v]: x for v, x in enumerate(values) if x != missing}
+
+
+# returns the distance (layer) of every vertex from start (-1 if not reachable)
+def bread_first_search(g, start):
+    offsets, targets = g.offsets, g.targets
+    explored = bytearray(g.num_vertices)
+    dist = array('i', [-1]) * g.num_vertices
+    explored[start] = 1
+    dist[start] = 0
+    work_queue = deque([start])
+    while len(work_queue) > 0:
+        v = work_queue.popleft()
+        d = dist[v] + 1
+        for i in range(offsets[v], offsets[v + 1]):
+            w = targets[i]
+            if not explored[w]:
+                explored[w] = 1  # mark w explored
+                dist[w] = d
+                work_queue.append(w)
+    return dist
+
+
+# Direction-optimizing BFS (Beamer, Asanovic and Patterson), returning the same distances as bread_first_search
+#   * top-down steps (as bread_first_search) scan the arcs out of the frontier for unexplored vertices
+#   * bottom-up steps scan the unexplored vertices for any arc in from the frontier (a vertex at distance
+#     layer - 1), and stop at the first one found
+# In the middle layers of low-diameter graphs the frontier is huge and most of the arcs out of it lead to explored
+# vertices, while a bottom-up step inspects few arcs per unexplored vertex. The search switches to bottom-up when the
+# frontier has more than 1/ALPHA of the arcs out of the unexplored vertices, and back to top-down when the frontier
+# has less than 1/BETA of the vertices.
+# NOTE: The bottom-up steps need the predecessors of the vertices: g_rev is g.reversed() for digraphs (compute it
+#       once, and reuse it for all searches), and g itself (the default) for undirected graphs
+ALPHA = 14
+BETA = 24
+
+
+def direction_optimizing_bfs(g, start, g_rev=None):
+    if g_rev is None:
+        g_rev = g
+    offsets, targets = g.offsets, g.targets
+    rev_offsets, sources = g_rev.offsets, g_rev.targets
+    n = g.num_vertices
+    dist = array('i', [-1]) * n
+    dist[start] = 0
+    frontier = [start]
+    unexplored = range(n)  # (a superset of) the unexplored vertices, pruned before every bottom-up step
+    unexplored_arcs = g.num_edges - (offsets[start + 1] - offsets[start])
+    bottom_up = False
+    layer = 0
+    while len(frontier) > 0:
+        frontier_arcs = sum(offsets[v + 1] - offsets[v] for v in frontier)
+        if bottom_up:
+            bottom_up = len(frontier) * BETA >= n
+        else:
+            bottom_up = frontier_arcs * ALPHA > unexplored_arcs
+        layer += 1
+        next_frontier = []
+        if bottom_up:
+            unexplored = [w for w in unexplored if dist[w] < 0]
+            for w in unexplored:
+                for i in range(rev_offsets[w], rev_offsets[w + 1]):
+                    if dist[sources[i]] == layer - 1:
+                        dist[w] = layer  # mark w explored
+                        next_frontier.append(w)
+                        break
+        else:
+            for v in frontier:
+                for i in range(offsets[v], offsets[v + 1]):
+                    w = targets[i]
+                    if dist[w] < 0:
+                        dist[w] = layer  # mark w explored
+                        next_frontier.append(w)
+        unexplored_arcs -= sum(offsets[w + 1] - offsets[w] for w in next_frontier)
+        frontier = next_frontier
+    return dist
+
+
+# stack-based DFS, numbering the vertices in the same order as search.depth_first_search (0 if not reachable)
+def depth_first_search(g, start):
+    offsets, targets = g.offsets, g.targets
+    explored = bytearray(g.num_vertices)
+    closure_no = array('i', bytes(4 * g.num_vertices))
+    explored[start] = 1
+    closure_no[start] = 1
+    work_stack = [start]
+    next_no = 2
+    while len(work_stack) > 0:
+        v = work_stack.pop()
+        # NOTE: incident edges need to be reversed in order to be searched in same order as recursive DFS
+        for i in range(offsets[v + 1] - 1, offsets[v] - 1, -1):
+            w = targets[i]
+            if not explored[w]:
+                explored[w] = 1  # mark w explored
+                closure_no[w] = next_no
+                next_no += 1
+                work_stack.append(w)
+    return closure_no
+
+
+# Iterative DFS-loop over all vertices (in order of the ids) with an explicit stack of (vertex, next edge index)
+# returns the vertices in order of their finishing times (the first vertex finishes first)
+def finishing_order(g):
+    offsets, targets = g.offsets, g.targets
+    n = g.num_vertices
+    explored = bytearray(n)
+    finished = array('i')
+    stack_vertex = array('i')
+    stack_edge = array('i')
+    for s in range(n):
+        if explored[s]:
+            continue
+        explored[s] = 1
+        stack_vertex.append(s)
+        stack_edge.append(offsets[s])
+        while len(stack_vertex) > 0:
+            v = stack_vertex[-1]
+            i = stack_edge[-1]
+            end = offsets[v + 1]
+            # advance to the next unexplored successor of v
+            while i < end and explored[targets[i]]:
+                i += 1
+            if i < end:
+                w = targets[i]
+                stack_edge[-1] = i + 1
+                explored[w] = 1
+                stack_vertex.append(w)
+                stack_edge.append(offsets[w])
+            else:
+                # all successors of v are explored (the bottom of the recursion)
+                stack_vertex.pop()
+                stack_edge.pop()
+                finished.append(v)
+    return finished
+
+
+# returns the topological order (1..n) of every vertex, just like search.topological_sort (of a DAG)
+def topological_sort(g):
+    n = g.num_vertices
+    order = array('i', bytes(4 * n))
+    for position, v in enumerate(finishing_order(g)):
+        order[v] = n - position  # The first 'sink' vertex get the highest order
+    return order
+
+
+# Kosaraju's two-pass algorithm (see search.kosaraju_scc), returning the leader of the SCC of every vertex
+def kosaraju_scc(g):
+    # step 1 and 2: the finishing times of the DFS-loop on G-reversed
+    magic_order = finishing_order(g.reversed())
+    # step 3: DFS-loop on G in decreasing order of the finishing times
+    offsets, targets = g.offsets, g.targets
+    n = g.num_vertices
+    explored = bytearray(n)
+    leaders = array('i', bytes(4 * n))
+    for i in range(n - 1, -1, -1):
+        leader = magic_order[i]
+        if explored[leader]:
+            continue
+        explored[leader] = 1
+        work_stack = [leader]
+        while len(work_stack) > 0:
+            v = work_stack.pop()
+            leaders[v] = leader
+            for j in range(offsets[v], offsets[v + 1]):
+                w = targets[j]
+                if not explored[w]:
+                    explored[w] = 1  # mark w explored
+                    work_stack.append(w)
+    return leaders
+
+
+def main():
+    # noinspection DuplicatedCode
+    g = CsrGraph.from_dict(
+        {1: [2, 3, 4, 7],
+         2: [1, 3, 4],
+         3: [1, 2, 4],
+         4: [1, 2, 3, 5],
+         5: [4, 6, 7, 8],
+         6: [5, 7, 8],
+         7: [1, 5, 6, 8],
+         8: [5, 6, 7]
+         })
+    print(f'The graph has {g.num_vertices} vertices and {g.num_edges} arcs in {len(g.targets.tobytes())} bytes')
+    closure_dist = label_map(g, bread_first_search(g, g.ids[1]))
+    for v in closure_dist:
+        print(f'{v}, dist({v}) = {closure_dist[v]}')
+    same_dist = label_map(g, direction_optimizing_bfs(g, g.ids[1])) == closure_dist
+    print(f'The direction-optimizing BFS gives the same distances: {same_dist}')
+    closure_no = label_map(g, depth_first_search(g, g.ids[1]), missing=0)
+    for v in closure_no:
+        print(f'{v}, no({v}) = {closure_no[v]}')
+
+    causal = CsrGraph.from_dict(
+        {"a": ["c"],
+         "b": ["c"],
+         "c": ["g"],
+         "d": ["f"],
+         "e": ["f"],
+         "f": ["g"],
+         "g": []  # sink = result
+         })
+    causal_order = label_map(causal, topological_sort(causal))
+    for v in causal_order:
+        print(f'causal_order({v}) = {causal_order[v]}')
+
+    # test case SCCs = ('a-b-c', 'd', 'e-f-g', 'h-i-j-k')
+    dg = CsrGraph.from_dict(
+        {"a": ["c", "d"],
+         "b": ["a"],
+         "c": ["b", "h", "j"],
+         "d": ["e", "f"],
+         "e": ["g"],
+         "f": ["e"],
+         "g": ["f"],
+         "h": ["f", "i", "k"],
+         "i": ["g", "k"],
+         "j": ["h"],
+         "k": ["j"]
+         })
+    scc = {}
+    for v, leader in enumerate(kosaraju_scc(dg)):
+        scc.setdefault(dg.labels[leader], []).append(dg.labels[v])
+    for v in scc:
+        print(f'scc({v}) = {scc[v]}')
+
+
+if __name__ == '__main__':
+    main()
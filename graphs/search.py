@@ -14,6 +14,58 @@ def bread_first_search(graph, start_vertex):
     return closure_dist
 
 
+# Point-to-point shortest hop distance from source to target using bidirectional BFS
+#   * a forward BFS from source (over graph) and a backward BFS from target (over reversed_g) are run
+#     alternately, one whole layer at a time, always expanding the smaller frontier
+#   * the search stops after the first layer where the two searches meet, and the shortest distance is the best
+#     meeting vertex of that layer (all vertices closer to either end have been explored)
+# This only explores the balls around source and target of about half the distance, instead of the entire
+# component explored by bread_first_search
+# NOTE: For undirected graphs reversed_g is the graph itself (the default), and for digraphs reversed_graph(graph)
+#       (compute it once, and reuse it for all queries)
+# Returns the distance (None if target is not reachable), or the pair (distance, path) if path is True
+def bidirectional_search(graph, source, target, reversed_g=None, path=False):
+    if reversed_g is None:
+        reversed_g = graph
+    graphs = (graph, reversed_g)
+    closure_dist = ({source: 0}, {target: 0})  # forward and backward distances
+    closure_parent = ({source: None}, {target: None})
+    frontiers = ([source], [target])
+    best_dist = 0 if source == target else None
+    meeting_vertex = source
+    while best_dist is None and len(frontiers[0]) > 0 and len(frontiers[1]) > 0:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        dist, parent = closure_dist[side], closure_parent[side]
+        other_dist = closure_dist[1 - side]
+        next_frontier = []
+        for v in frontiers[side]:
+            for w in graphs[side][v]:
+                if w not in dist:
+                    dist[w] = dist[v] + 1  # mark w explored
+                    parent[w] = v
+                    next_frontier.append(w)
+                    if w in other_dist and (best_dist is None or dist[w] + other_dist[w] < best_dist):
+                        best_dist = dist[w] + other_dist[w]
+                        meeting_vertex = w
+        frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+    if not path:
+        return best_dist
+    if best_dist is None:
+        return None, None
+    # walk back from the meeting vertex to source, and forward from the meeting vertex to target
+    hops = []
+    v = meeting_vertex
+    while v is not None:
+        hops.append(v)
+        v = closure_parent[0][v]
+    hops.reverse()
+    v = closure_parent[1][meeting_vertex]
+    while v is not None:
+        hops.append(v)
+        v = closure_parent[1][v]
+    return best_dist, hops
+
+
 # stack-based impl of DFS
 def depth_first_search(graph, start_vertex):
     closure_no = {start_vertex: 1}
@@ -99,15 +151,88 @@ def topological_sort(graph):
 
 
 # DFS is the inner-loop sub-routine
+# NOTE: iterative with an explicit stack of (vertex, iterator of the successors not yet searched), such that deep
+#       graphs do not blow the recursion limit (the vertices finish in the same order as the recursive DFS)
 def _topological_sort_dfs(graph, vertex, explored, closure_order, next_order):
     explored.add(vertex)
-    for v in graph[vertex]:
-        # if v not yet explored
-        if v not in explored:
-            # perform DFS starting at v (recursively)
-            next_order = _topological_sort_dfs(graph, v, explored, closure_order, next_order)
-    closure_order[vertex] = next_order  # update the order
-    return next_order - 1
+    work_stack = [(vertex, iter(graph[vertex]))]
+    while len(work_stack) > 0:
+        v, successors = work_stack[-1]
+        for w in successors:
+            # if w not yet explored
+            if w not in explored:
+                # perform DFS starting at w (push it on the stack, and resume v later)
+                explored.add(w)
+                work_stack.append((w, iter(graph[w])))
+                break
+        else:
+            # all successors of v are explored (the bottom of the recursion)
+            work_stack.pop()
+            closure_order[v] = next_order  # update the order
+            next_order -= 1
+    return next_order
+
+
+# Kahn's algorithm: topological ordering by in-degrees (of DAG), without recursion
+# The vertices are ordered in levels (layers): the sources (in-degree zero) are level 0, and the vertices of level
+# i + 1 have all their predecessors in levels 0..i (i.e. the level is the length of the longest path from a source)
+# NOTE: All vertices of the same level can be processed concurrently (once all previous levels are done)
+# NOTE: If the graph has a cycle, the vertices on (or after) the cycle never reach in-degree zero
+def kahn_topological_sort(graph):
+    in_degree = {v: 0 for v in graph}
+    for v in graph:
+        for w in graph[v]:
+            in_degree[w] = in_degree.get(w, 0) + 1
+    closure_level = {}
+    level = [v for v in in_degree if in_degree[v] == 0]
+    level_no = 0
+    while len(level) > 0:
+        next_level = []
+        for v in level:
+            closure_level[v] = level_no
+            for w in graph.get(v, ()):
+                in_degree[w] -= 1
+                if in_degree[w] == 0:
+                    next_level.append(w)
+        level = next_level
+        level_no += 1
+    if len(closure_level) < len(in_degree):
+        cyclic = [v for v in in_degree if v not in closure_level]
+        raise ValueError(f'The graph has a cycle (through some of {cyclic}).')
+    return closure_level
+
+
+# the lists of vertices of every level (in increasing level order)
+def topological_levels(closure_level):
+    levels = [[] for _ in range(max(closure_level.values(), default=-1) + 1)]
+    for v, level_no in closure_level.items():
+        levels[level_no].append(v)
+    return levels
+
+
+# Incrementally insert the arc (u, v) into the DAG, and update the levels of kahn_topological_sort (in place)
+#   * if level(u) < level(v) nothing changes
+#   * otherwise v (and the vertices reachable from v) must be raised, which only touches the raised vertices
+# NOTE: If the arc closes a cycle (i.e. u is reachable from v) ValueError is raised, and graph and closure_level
+#       are unchanged
+def insert_arc(graph, closure_level, u, v):
+    level_u = closure_level.setdefault(u, 0)
+    raised = {}  # the new levels of the raised vertices
+    if closure_level.setdefault(v, 0) <= level_u:
+        raised[v] = level_u + 1
+        work_list = [v]
+        while len(work_list) > 0:
+            x = work_list.pop()
+            if x == u:
+                raise ValueError(f'The arc ({u}, {v}) closes a cycle.')
+            for w in graph.get(x, ()):
+                level_w = raised.get(w, closure_level[w])
+                if level_w <= raised[x]:
+                    raised[w] = raised[x] + 1
+                    work_list.append(w)
+    graph.setdefault(u, []).append(v)
+    graph.setdefault(v, [])
+    closure_level.update(raised)
 
 
 # NOTE: strongly connected components are a subset of vertices of the (di-)graph, where
@@ -154,14 +279,76 @@ def kosaraju_scc(graph):
 
 
 # DFS is the inner-loop sub-routine
+# NOTE: iterative with an explicit stack (see _topological_sort_dfs)
 def _kosaraju_scc_dfs(graph, vertex, closure_leaders, leader):
     closure_leaders[vertex] = None  # mark vertex explored
-    for v in graph[vertex]:
-        # if v not yet explored
-        if v not in closure_leaders:
-            # perform DFS starting at v (recursively)
-            _kosaraju_scc_dfs(graph, v, closure_leaders, leader)
-    closure_leaders[vertex] = leader  # update the order
+    work_stack = [(vertex, iter(graph[vertex]))]
+    while len(work_stack) > 0:
+        v, successors = work_stack[-1]
+        for w in successors:
+            # if w not yet explored
+            if w not in closure_leaders:
+                # perform DFS starting at w
+                closure_leaders[w] = None  # mark w explored
+                work_stack.append((w, iter(graph[w])))
+                break
+        else:
+            work_stack.pop()
+            closure_leaders[v] = leader  # update the order
+
+
+# Tarjan's single-pass SCC algorithm (iterative)
+#   * one DFS-loop over G (no reversed graph), where index[v] is the discovery order of v, and low[v] is the
+#     smallest index of any vertex on the SCC stack reachable from the DFS subtree of v
+#   * when v finishes with low[v] == index[v], v is the leader (first discovered vertex) of an SCC, and the
+#     SCC is every vertex above (and including) v on the SCC stack
+# Returns the same dict of scc-lists {leader: [members]} as kosaraju_scc (the leaders may differ)
+def tarjan_scc(graph):
+    index = {}  # marks the explored vertices
+    low = {}
+    on_scc_stack = set()
+    scc_stack = []
+    result = {}
+    next_index = 0
+    # outer loop
+    for s in graph:
+        if s in index:
+            continue
+        index[s] = low[s] = next_index
+        next_index += 1
+        scc_stack.append(s)
+        on_scc_stack.add(s)
+        work_stack = [(s, iter(graph[s]))]
+        while len(work_stack) > 0:
+            v, successors = work_stack[-1]
+            for w in successors:
+                if w not in index:
+                    # perform DFS starting at w
+                    index[w] = low[w] = next_index
+                    next_index += 1
+                    scc_stack.append(w)
+                    on_scc_stack.add(w)
+                    work_stack.append((w, iter(graph[w])))
+                    break
+                elif w in on_scc_stack and index[w] < low[v]:
+                    low[v] = index[w]
+            else:
+                # v finishes (back-track to the parent u)
+                work_stack.pop()
+                if len(work_stack) > 0:
+                    u = work_stack[-1][0]
+                    if low[v] < low[u]:
+                        low[u] = low[v]
+                if low[v] == index[v]:
+                    members = []
+                    while True:
+                        w = scc_stack.pop()
+                        on_scc_stack.remove(w)
+                        members.append(w)
+                        if w == v:
+                            break
+                    result[v] = members
+    return result
 
 
 # utility function
@@ -189,6 +376,8 @@ def main():
     closure_dist = bread_first_search(g, 1)
     for v in closure_dist:
         print(f'{v}, dist({v}) = {closure_dist[v]}')
+    dist, hops = bidirectional_search(g, 1, 8, path=True)
+    print(f'dist(1, 8) = {dist} via {hops}')
     closure_no = depth_first_search(g, 1)
     for v in closure_no:
         print(f'{v}, no({v}) = {closure_no[v]}')
@@ -223,6 +412,15 @@ def main():
     for v in causal_order:
         print(f'causal_order({v}) = {causal_order[v]}')
 
+    # the steps of every level can run concurrently
+    causal_level = kahn_topological_sort(causal)
+    for level_no, level in enumerate(topological_levels(causal_level)):
+        print(f'level {level_no} = {level}')
+    insert_arc(causal, causal_level, "g", "h")  # h = g + 1
+    insert_arc(causal, causal_level, "a", "f")  # f = d + e + a
+    for level_no, level in enumerate(topological_levels(causal_level)):
+        print(f'level {level_no} = {level}')
+
     # test case SCCs = ('a-b-c', 'd', 'e-f-g', 'h-i-j-k')
     dg = \
         {"a": ["c", "d"],
@@ -240,6 +438,9 @@ def main():
     scc = kosaraju_scc(dg)
     for v in scc:
         print(f'scc({v}) = {scc[v]}')
+    scc = tarjan_scc(dg)
+    for v in scc:
+        print(f'tarjan_scc({v}) = {scc[v]}')
 
 
 if __name__ == '__main__':
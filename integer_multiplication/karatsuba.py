@@ -9,7 +9,10 @@
 
 # recursive function
 # See also https://github.com/python/cpython/blob/6f2a8c08573c71b78d2f6e2bfaf31641a0cd092b/Objects/longobject.c#L102
-def karatsuba_multiplication(xs, ys):
+# stats is the Counters (see sorting/instrumentation.py) the operations are counted into, or None (nothing is counted)
+# NOTE: The counters are passed explicitly (instead of using instrumentation.active), because this directory is a
+#       separate source root that cannot import the instrumentation module
+def karatsuba_multiplication(xs, ys, stats=None):
     nx = len(xs)
     ny = len(ys)
 
@@ -23,10 +26,18 @@ def karatsuba_multiplication(xs, ys):
     xs = pad(xs, n - nx)
     ys = pad(ys, n - ny)
 
+    if stats is not None:
+        stats.enter()
+        stats.allocations += (nx < n) + (ny < n)  # padding copies the digits
+
     # recursive algorithm
     if n == 1:
         # base case
         c, r = single_digit_multiplication(xs[0], ys[0])
+        if stats is not None:
+            stats.multiplications += 1
+            stats.allocations += 1
+            stats.leave()
         return [c, r]
         # This this NOT necessary
         # if c > 0:
@@ -40,14 +51,19 @@ def karatsuba_multiplication(xs, ys):
         c = ys[:m]  # do for y
         d = ys[m:]  # do for y
         # build up the recursive tree calling ourselves (recursively)
-        ac = karatsuba_multiplication(a, c)
-        bd = karatsuba_multiplication(b, d)
+        ac = karatsuba_multiplication(a, c, stats)
+        bd = karatsuba_multiplication(b, d, stats)
         p = addition(a, b)
         q = addition(c, d)
-        pq = karatsuba_multiplication(p, q)
+        pq = karatsuba_multiplication(p, q, stats)
         # traverse up the recursive tree using the non-recursive formula
         ad_bc = subtraction(subtraction(pq, ac), bd)
-        return addition(addition(power(ac, n), power(ad_bc, m)), bd)
+        result = addition(addition(power(ac, n), power(ad_bc, m)), bd)
+        if stats is not None:
+            # 4 slices, 2 additions (p and q), 2 subtractions, 2 powers and 2 additions (result)
+            stats.allocations += 12
+            stats.leave()
+        return result
 
 
 # The algorithm requires n-digit numbers, where n is the power of 2 (otherwise the decomposition
@@ -18,7 +18,6 @@
 
 # NOTE: We work with matrices of integers!!!!
 
-
 # noinspection PyPep8Naming
 def matrix_dimensions(A):
     n = len(A)
@@ -104,12 +103,21 @@ def matrix_multiply_simple(X, Y):
 
 
 # Recursive function (divide and conquer)
+# stats is the Counters (see sorting/instrumentation.py) the operations are counted into, or None (nothing is counted)
+# NOTE: The counters are passed explicitly (instead of using instrumentation.active), because this directory is a
+#       separate source root that cannot import the instrumentation module
 # noinspection PyPep8Naming
-def matrix_multiply_strassen(X, Y):
+def matrix_multiply_strassen(X, Y, stats=None):
     n = ensure_equal_square_dimensions(X, Y)
     assert n > 0  # because of padding
+    if stats is not None:
+        stats.enter()
     if n <= 1:
         # base case
+        if stats is not None:
+            stats.multiplications += 1
+            stats.allocations += 1
+            stats.leave()
         return [[X[0][0] * Y[0][0]]]
     else:
         A, B, C, D, pad = split_matrix(X)
@@ -126,18 +134,22 @@ def matrix_multiply_strassen(X, Y):
         AC = matrix_subtraction(A, C)
         EF = matrix_addition(E, F)
         # 7 recursive calls
-        P1 = matrix_multiply_strassen(A, FH)
-        P2 = matrix_multiply_strassen(AB, H)
-        P3 = matrix_multiply_strassen(CD, E)
-        P4 = matrix_multiply_strassen(D, GE)
-        P5 = matrix_multiply_strassen(AD, EH)
-        P6 = matrix_multiply_strassen(BD, GH)
-        P7 = matrix_multiply_strassen(AC, EF)
+        P1 = matrix_multiply_strassen(A, FH, stats)
+        P2 = matrix_multiply_strassen(AB, H, stats)
+        P3 = matrix_multiply_strassen(CD, E, stats)
+        P4 = matrix_multiply_strassen(D, GE, stats)
+        P5 = matrix_multiply_strassen(AD, EH, stats)
+        P6 = matrix_multiply_strassen(BD, GH, stats)
+        P7 = matrix_multiply_strassen(AC, EF, stats)
         # strassen combination
         R11 = matrix_add3_subtract1(P4, P5, P6, P2)
         R12 = matrix_addition(P1, P2)
         R21 = matrix_addition(P3, P4)
         R22 = matrix_add2_subtract2(P1, P5, P3, P7)
+        if stats is not None:
+            # 8 sub-matrices (split), 10 additions and subtractions, 4 combinations and the combined result
+            stats.allocations += 23
+            stats.leave()
         # combine the 4 matrices
         return combine_matrix(R11, R12, R21, R22, pad)
 
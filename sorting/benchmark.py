@@ -0,0 +1,210 @@
+# standard library imports
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+# local imports (added as source root in pycharm)
+import instrumentation
+import inversions
+from merge_sort import (merge_sort, merge_sort_bottom_up, natural_merge_sort)
+from quick_sort import (sort_pivot_first, sort_pivot_last, sort_pivot_median, sort_pivot_randomly,
+                        sort_intro, sort_three_way, sort_dual_pivot)
+from radix_sort import radix_sort
+
+# Benchmark suite for the sorters
+#   * every sorter is run on every kind of generated input for every size
+#   * a run records the wall time, the peak memory (using tracemalloc) and the number of comparisons (None for the
+#     sorters that neither count their comparisons nor report them to instrumentation)
+#   * once a sorter fails (e.g. hits the recursion limit) or exceeds the time budget on some kind of input, the
+#     larger sizes of that kind of input are skipped (e.g. the quadratic cases of the sort_pivot_* strategies)
+#   * the results are saved as JSON, and can be compared against a saved baseline to flag regressions
+#
+# usage:
+#     python benchmark.py --sizes 1000 10000 --output results.json
+#     python benchmark.py --sizes 1000 10000 --baseline results.json
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+DEFAULT_MAX_SECONDS = 60.0
+DEFAULT_TOLERANCE = 0.2  # relative slack before a measurement counts as a regression
+MIN_SECONDS_DELTA = 0.05  # timing differences below this are noise (not regressions)
+
+
+#
+# Input generators (every generator returns a list of n integers)
+#
+
+
+def random_input(n):
+    return [random.randint(0, n) for _ in range(n)]
+
+
+def sorted_input(n):
+    return list(range(n))
+
+
+def reversed_input(n):
+    return list(range(n, 0, -1))
+
+
+# ascending first half and descending second half
+def organ_pipe_input(n):
+    m = n // 2
+    return list(range(m)) + list(range(n - m, 0, -1))
+
+
+def few_unique_input(n):
+    return [random.randint(0, 9) for _ in range(n)]
+
+
+# Musser's median-of-3 killer sequence (from the introsort paper), for n a multiple of 4
+# NOTE: For other n the missing (largest) elements are appended in sorted order
+def median_of_three_killer_input(n):
+    k = (n // 4) * 2
+    xs = [0] * (2 * k)
+    for i in range(1, k + 1):
+        if i % 2 == 1:
+            xs[i - 1] = i
+            xs[i] = k + i
+        xs[k + i - 1] = 2 * i
+    xs.extend(range(2 * k + 1, n + 1))
+    return xs
+
+
+INPUTS = {
+    'random': random_input,
+    'sorted': sorted_input,
+    'reversed': reversed_input,
+    'organ_pipe': organ_pipe_input,
+    'few_unique': few_unique_input,
+    'median_of_three_killer': median_of_three_killer_input,
+}
+
+# NOTE: All sorters leave the input unchanged (the in-place sorters are given a copy)
+SORTERS = {
+    'merge_sort': merge_sort,
+    'merge_sort_bottom_up': lambda xs: merge_sort_bottom_up(xs[:]),
+    'natural_merge_sort': lambda xs: natural_merge_sort(xs[:]),
+    'inversions.sort': inversions.sort,
+    'sort_pivot_first': sort_pivot_first,
+    'sort_pivot_last': sort_pivot_last,
+    'sort_pivot_median': sort_pivot_median,
+    'sort_pivot_randomly': sort_pivot_randomly,
+    'sort_intro': sort_intro,
+    'sort_three_way': sort_three_way,
+    'sort_dual_pivot': sort_dual_pivot,
+    'radix_sort': radix_sort,  # NOTE: not comparison based
+}
+
+# the sorters (not returning their own count) that report their comparisons to instrumentation
+# NOTE: radix_sort makes no comparisons at all, and must not be added here (its comparisons are recorded as None, and
+#       not as a measured 0 that would be compared to a baseline)
+INSTRUMENTED_SORTERS = {'merge_sort', 'inversions.sort'}
+
+
+#
+# Measurements
+#
+
+
+# returns a result record for a single run of sorter on xs
+# instrumented is whether sorter reports its comparisons to instrumentation
+def measure(sorter, xs, measure_memory=True, instrumented=False):
+    result = {'seconds': None, 'peak_bytes': None, 'comparisons': None}
+    try:
+        start = time.perf_counter()
+        sorter(xs)
+        result['seconds'] = time.perf_counter() - start
+        if measure_memory:
+            # a second (slower) run that traces the memory and counts the operations
+            tracemalloc.start()
+            try:
+                with instrumentation.instrument() as counters:
+                    r = sorter(xs)
+                result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            # the sort_pivot_* family (and other quick sorts) count their own comparisons
+            if isinstance(r, tuple):
+                result['comparisons'] = r[1]
+            elif instrumented:
+                result['comparisons'] = counters.comparisons
+        result['status'] = 'ok'
+    except RecursionError:
+        result['status'] = 'recursion_limit'
+    return result
+
+
+def run(sorter_names, input_names, sizes, max_seconds=DEFAULT_MAX_SECONDS, measure_memory=True, seed=0):
+    results = []
+    for input_name in input_names:
+        for sorter_name in sorter_names:
+            skip = False
+            for n in sizes:
+                record = {'sorter': sorter_name, 'input': input_name, 'size': n}
+                if skip:
+                    record['status'] = 'skipped'
+                else:
+                    random.seed(seed)  # same input for every sorter
+                    xs = INPUTS[input_name](n)
+                    record.update(measure(SORTERS[sorter_name], xs, measure_memory,
+                                          sorter_name in INSTRUMENTED_SORTERS))
+                    skip = record['status'] != 'ok' or record['seconds'] > max_seconds
+                results.append(record)
+                print(json.dumps(record), file=sys.stderr)
+    return results
+
+
+# returns a list of regression messages of results compared to baseline (both lists of result records)
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    baseline_by_key = {(r['sorter'], r['input'], r['size']): r for r in baseline}
+    regressions = []
+    for r in results:
+        key = (r['sorter'], r['input'], r['size'])
+        b = baseline_by_key.get(key)
+        if b is None:
+            continue
+        if b['status'] == 'ok' and r['status'] != 'ok':
+            regressions.append(f'{key}: status {b["status"]} -> {r["status"]}')
+            continue
+        for metric in ['seconds', 'peak_bytes', 'comparisons']:
+            if r.get(metric) is None or b.get(metric) is None:
+                continue
+            if metric == 'seconds' and r[metric] - b[metric] < MIN_SECONDS_DELTA:
+                continue
+            if r[metric] > b[metric] * (1 + tolerance):
+                regressions.append(f'{key}: {metric} {b[metric]} -> {r[metric]}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the sorters on generated inputs.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--sorters', nargs='+', choices=list(SORTERS), default=list(SORTERS))
+    parser.add_argument('--inputs', nargs='+', choices=list(INPUTS), default=list(INPUTS))
+    parser.add_argument('--max-seconds', type=float, default=DEFAULT_MAX_SECONDS)
+    parser.add_argument('--no-memory', action='store_true', help='skip the memory (and comparison) measurements')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='save the results to this JSON file')
+    parser.add_argument('--baseline', help='compare the results to this (saved) JSON file')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    results = run(args.sorters, args.inputs, args.sizes, args.max_seconds, not args.no_memory, args.seed)
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump({'results': results}, fp, indent=2)
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f'REGRESSION {message}')
+        if len(regressions) > 0:
+            sys.exit(1)
+        print('No regressions.')
+
+
+if __name__ == '__main__':
+    main()
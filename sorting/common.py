@@ -1,5 +1,9 @@
+# standard library imports
 import random
 
+# local imports (added as source root in pycharm)
+import instrumentation
+
 
 # Partition the range(l, h) == l..h-1
 # in-place swapping (mutation) of elements such that the array is partitioned into 3 parts
@@ -28,10 +32,208 @@ def partition(xs, l, h, p):
     # NOTE: If all elements are bigger than the pivot (j-1 == l) we are doing a redundant swap
     xs[l], xs[j - 1] = xs[j - 1], xs[l]
 
+    stats = instrumentation.active
+    if stats is not None:
+        stats.comparisons += h - l - 1
+        stats.swaps += (j - l) + (1 if p > l else 0)
+        stats.partitioned(j - 1 - l, h - j)
+
     # report final pivot position (index)
     return j - 1
 
 
+# Partition of parallel arrays: the keys ks are partitioned exactly as partition does, and every swap of two keys
+# is mirrored in the values vs (such that sorting only compares the precomputed keys)
+def partition_keyed(ks, vs, l, h, p):
+    if p > l:
+        ks[l], ks[p] = ks[p], ks[l]
+        vs[l], vs[p] = vs[p], vs[l]
+
+    pivot = ks[l]
+    j = l + 1
+    for i in range(l + 1, h):
+        if ks[i] < pivot:
+            ks[i], ks[j] = ks[j], ks[i]
+            vs[i], vs[j] = vs[j], vs[i]
+            j += 1
+
+    ks[l], ks[j - 1] = ks[j - 1], ks[l]
+    vs[l], vs[j - 1] = vs[j - 1], vs[l]
+    return j - 1
+
+
+# Three-way (fat) partition of the range(l, h) == l..h-1 (Dijkstra's dutch national flag)
+# in-place swapping (mutation) of elements such that the array is partitioned into 3 parts
+#   1. sub-array with all elements less than the pivot: l..lt-1
+#   2. sub-array with all elements equal to the pivot: lt..gt-1
+#   3. sub-array with all elements greater than the pivot: gt..h-1
+# returns the range [lt, gt) of elements equal to the pivot, which describes the partition
+# NOTE: With many duplicate keys the (possibly big) middle part never has to be partitioned again
+# INVARIANT:
+#   * xs[l..lt-1] < pivot, xs[lt..i-1] == pivot, xs[i..gt-1] not yet seen, xs[gt..h-1] > pivot
+def three_way_partition(xs, l, h, p):
+    pivot = xs[p]
+    lt = l
+    i = l
+    gt = h
+    while i < gt:
+        x = xs[i]
+        if x < pivot:
+            xs[lt], xs[i] = x, xs[lt]
+            lt += 1
+            i += 1
+        elif pivot < x:
+            gt -= 1
+            xs[gt], xs[i] = x, xs[gt]
+        else:
+            i += 1
+    return lt, gt
+
+
+# Dual-pivot partition of the range(l, h) == l..h-1 (Yaroslavskiy)
+# in-place swapping (mutation) of elements such that the array is partitioned into 5 parts
+#   1. sub-array with all elements less than the left pivot
+#   2. left pivot element
+#   3. sub-array with all elements between the left and right pivot (both inclusive)
+#   4. right pivot element
+#   5. sub-array with all elements greater than the right pivot
+# p and q are the (distinct) indices of the two pivots, where the smaller becomes the left pivot
+# returns the indices of the two pivots, and the number of comparisons made
+# NOTE: A single scan splits the range into 3 parts (instead of 2), so every element takes part in fewer scans
+# INVARIANT:
+#   * xs[l+1..lt-1] < left pivot, left pivot <= xs[lt..i-1] <= right pivot, xs[gt+1..h-2] > right pivot
+def dual_pivot_partition(xs, l, h, p, q):
+    # normalize the pivot indices to the left-most and right-most element
+    xs[l], xs[p] = xs[p], xs[l]
+    if q == l:
+        q = p  # the right pivot was just swapped into index p
+    xs[h - 1], xs[q] = xs[q], xs[h - 1]
+    count = 1
+    if xs[h - 1] < xs[l]:
+        xs[l], xs[h - 1] = xs[h - 1], xs[l]
+    lp = xs[l]
+    rp = xs[h - 1]
+
+    lt = l + 1
+    gt = h - 2
+    i = l + 1
+    while i <= gt:
+        x = xs[i]
+        count += 1
+        if x < lp:
+            xs[i], xs[lt] = xs[lt], x
+            lt += 1
+        else:
+            count += 1
+            if rp < x:
+                # find the right-most element not greater than the right pivot
+                while i < gt:
+                    count += 1
+                    if not rp < xs[gt]:
+                        break
+                    gt -= 1
+                xs[i], xs[gt] = xs[gt], x
+                gt -= 1
+                x = xs[i]
+                count += 1
+                if x < lp:
+                    xs[i], xs[lt] = xs[lt], x
+                    lt += 1
+        i += 1
+
+    # swap the pivots into the correct indices
+    lt -= 1
+    gt += 1
+    xs[l], xs[lt] = xs[lt], xs[l]
+    xs[h - 1], xs[gt] = xs[gt], xs[h - 1]
+    return lt, gt, count
+
+
+# Dual-pivot partition of the range(l, h) == l..h-1 where most elements are expected on one side (Floyd-Rivest)
+# The result is the same 5 parts as dual_pivot_partition, and so are p, q and the return values
+# If right_first is true every element is compared first with the right pivot (and then with the left pivot only if
+# it is not greater), otherwise every element is compared first with the left pivot (and then with the right pivot
+# only if it is not smaller), so every element on the far side of the first pivot takes a single comparison
+# NOTE: Every element is classified exactly once (an element swapped into index i is classified next)
+# INVARIANT:
+#   * xs[l+1..lt-1] < left pivot, left pivot <= xs[lt..i-1] <= right pivot, xs[gt+1..h-2] > right pivot
+def dual_pivot_partition_skewed(xs, l, h, p, q, right_first):
+    # normalize the pivot indices to the left-most and right-most element
+    xs[l], xs[p] = xs[p], xs[l]
+    if q == l:
+        q = p  # the right pivot was just swapped into index p
+    xs[h - 1], xs[q] = xs[q], xs[h - 1]
+    count = 1
+    if xs[h - 1] < xs[l]:
+        xs[l], xs[h - 1] = xs[h - 1], xs[l]
+    lp = xs[l]
+    rp = xs[h - 1]
+
+    lt = l + 1
+    gt = h - 2
+    i = l + 1
+    while i <= gt:
+        x = xs[i]
+        count += 1
+        if right_first:
+            if rp < x:
+                xs[i], xs[gt] = xs[gt], x
+                gt -= 1
+                continue
+            count += 1
+            if x < lp:
+                xs[i], xs[lt] = xs[lt], x
+                lt += 1
+        else:
+            if x < lp:
+                xs[i], xs[lt] = xs[lt], x
+                lt += 1
+            else:
+                count += 1
+                if rp < x:
+                    xs[i], xs[gt] = xs[gt], x
+                    gt -= 1
+                    continue
+        i += 1
+
+    # swap the pivots into the correct indices
+    lt -= 1
+    gt += 1
+    xs[l], xs[lt] = xs[lt], xs[l]
+    xs[h - 1], xs[gt] = xs[gt], xs[h - 1]
+    return lt, gt, count
+
+
+# Move the elements equal to either pivot out of the middle part of a dual-pivot partition (JDK-style)
+# in-place swapping (mutation) of the elements of the range(l, h), which are all in the range lp..rp (lp < rp),
+# such that the array is partitioned into 3 parts
+#   1. sub-array with all elements equal to the left pivot
+#   2. sub-array with all elements strictly between the two pivots
+#   3. sub-array with all elements equal to the right pivot
+# returns the range of the second part, and the number of comparisons made
+# NOTE: Without this, a middle part with many duplicates of the pivots only shrinks by the 2 pivots per partition
+def squeeze_pivots(xs, l, h, lp, rp):
+    lt = l
+    i = l
+    gt = h
+    count = 0
+    while i < gt:
+        x = xs[i]
+        count += 1
+        if not lp < x:
+            xs[lt], xs[i] = x, xs[lt]
+            lt += 1
+            i += 1
+        else:
+            count += 1
+            if not x < rp:
+                gt -= 1
+                xs[gt], xs[i] = x, xs[gt]
+            else:
+                i += 1
+    return lt, gt, count
+
+
 # This partition sub-routine is not elegant (and my own invention)
 def my_partition(xs, p):
     # normalize pivot index to zero
@@ -82,6 +284,17 @@ def choose_pivot_randomly(l, h):
     return random.randint(l, h - 1)
 
 
+# choose the two pivots for dual_pivot_partition at the tertiles of the range(l, h) (requires h - l >= 2)
+def choose_pivots_tertiles(l, h):
+    n = h - l
+    return l + n // 3, l + (2 * n) // 3
+
+
+def choose_pivots_randomly(l, h):
+    p, q = random.sample(range(l, h), 2)
+    return p, q
+
+
 # NOTE: get better performance for (nearly) sorted arrays (also reverse sorted arrays)
 def choose_pivot_median_of_three(xs, l, h):
     # NOTE: for 2 elements we just replicate the last element
@@ -103,3 +316,55 @@ def insertion_sort(xs, perm):
         if xs[1] < xs[0]:
             xs[1], xs[0] = xs[0], xs[1]
             perm[1], perm[0] = perm[0], perm[1]
+
+
+# insertion sort of the range(l, h), that returns the number of comparisons
+def insertion_sort_range(xs, l, h):
+    count = 0
+    for i in range(l + 1, h):
+        x = xs[i]
+        j = i
+        while j > l:
+            count += 1
+            if not x < xs[j - 1]:
+                break
+            xs[j] = xs[j - 1]
+            j -= 1
+        xs[j] = x
+    return count
+
+
+# heap sort of the range(l, h), that returns the number of comparisons
+# NOTE: The heap is a max-heap stored in xs[l..h-1] with the children of (relative) index i at 2i+1 and 2i+2
+def heap_sort(xs, l, h):
+    n = h - l
+    count = 0
+    # heapify bottom-up
+    for i in range(n // 2 - 1, -1, -1):
+        count += sift_down(xs, l, i, n)
+    # repeatedly move the max element to the end of the (shrinking) heap
+    for end in range(n - 1, 0, -1):
+        xs[l], xs[l + end] = xs[l + end], xs[l]
+        count += sift_down(xs, l, 0, end)
+    return count
+
+
+# restore the max-heap property of the heap xs[l..l+n-1] below (relative) index i
+def sift_down(xs, l, i, n):
+    count = 0
+    x = xs[l + i]
+    while True:
+        child = 2 * i + 1
+        if child >= n:
+            break
+        if child + 1 < n:
+            count += 1
+            if xs[l + child] < xs[l + child + 1]:
+                child += 1
+        count += 1
+        if not x < xs[l + child]:
+            break
+        xs[l + i] = xs[l + child]
+        i = child
+    xs[l + i] = x
+    return count
@@ -0,0 +1,124 @@
+# standard library imports
+import heapq
+import os
+import tempfile
+from array import array
+from itertools import islice
+
+# local imports (added as source root in pycharm)
+from merge_sort import merge_sort_bottom_up
+
+# External (out-of-core) merge sort of a file with one integer per line (same format as problem5.6.txt)
+#   1. read the input in chunks of (at most) buffer_bytes // BYTES_PER_INTEGER integers, parsed into an array('q'),
+#      sort each chunk in memory (reusing a single auxiliary array) and spill it to a temporary file as a sorted
+#      run (binary signed 64-bit integers, 8 bytes per integer)
+#   2. k-way merge the sorted runs (using a heap) into the output file, reading every run in blocks
+# Peak memory is about buffer_bytes (not proportional to the size of the input file)
+#   * step 1 holds the chunk and the auxiliary array of the merge sort (8 + 8 bytes per integer), and the temporary
+#     copy of the tail of the last merge of the merge sort (up to half the chunk, i.e. up to 4 bytes per integer)
+#   * step 2 holds an input block per run and the output blocks (array('q') blocks sharing the buffer evenly)
+#   * plus a constant (about 150 KiB) for parsing (READ_BLOCK lines) and formatting (WRITE_BLOCK integers) the text
+# NOTE: integers must fit in a signed 64-bit integer (otherwise array('q') raises OverflowError)
+DEFAULT_BUFFER_BYTES = 8 << 20  # 8 MiB (the memory budget)
+BYTES_PER_INTEGER = 20  # a chunk, the auxiliary array and the tail copy of the merge sort
+READ_BLOCK = 1024  # the number of lines parsed at once
+WRITE_BLOCK = 1024  # the number of integers formatted at once
+MAX_FAN_IN = 64  # the maximum number of runs (open files) merged at once
+
+
+def external_sort(input_path, output_path, buffer_bytes=DEFAULT_BUFFER_BYTES):
+    buffer_size = max(1, buffer_bytes // BYTES_PER_INTEGER)  # the number of integers in a chunk
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        run_paths = spill_sorted_runs(input_path, tmp_dir, buffer_size)
+        # the merge holds 8 bytes per integer (in array('q') blocks)
+        merge_size = max(1, buffer_bytes // 8)
+        # if there are too many runs we merge them in more than one pass
+        next_no = len(run_paths)
+        while len(run_paths) > MAX_FAN_IN:
+            merged_paths = []
+            for i in range(0, len(run_paths), MAX_FAN_IN):
+                group = run_paths[i:i + MAX_FAN_IN]
+                path = os.path.join(tmp_dir, f'run{next_no}.bin')
+                next_no += 1
+                with open(path, 'wb') as fp:
+                    for block in merged_blocks(group, merge_size):
+                        block.tofile(fp)
+                for p in group:
+                    os.remove(p)
+                merged_paths.append(path)
+            run_paths = merged_paths
+        with open(output_path, 'w') as fp:
+            for block in merged_blocks(run_paths, merge_size):
+                for i in range(0, len(block), WRITE_BLOCK):
+                    fp.write('\n'.join(map(str, block[i:i + WRITE_BLOCK])))
+                    fp.write('\n')
+
+
+# Step 1: returns the list of paths of the sorted runs
+def spill_sorted_runs(input_path, tmp_dir, buffer_size):
+    run_paths = []
+    aux = None  # the auxiliary array of the merge sort (allocated once, and reused for every chunk)
+    with open(input_path) as fp:
+        while True:
+            xs = array('q')
+            while len(xs) < buffer_size:
+                lines = list(islice(fp, min(READ_BLOCK, buffer_size - len(xs))))
+                if len(lines) == 0:
+                    break
+                xs.extend(int(line) for line in lines if not line.isspace())
+            if len(xs) == 0:
+                break
+            if aux is None:
+                aux = array('q', [0]) * len(xs)
+            merge_sort_bottom_up(xs, aux)
+            path = os.path.join(tmp_dir, f'run{len(run_paths)}.bin')
+            with open(path, 'wb') as run_fp:
+                xs.tofile(run_fp)
+            run_paths.append(path)
+            del xs
+    return run_paths
+
+
+# Step 2: k-way merge of the sorted runs, yielding the merged output in blocks (array('q')) of integers
+# NOTE: The buffer is shared evenly between the input blocks of all runs, the bytes read for an input block (a
+#       temporary copy), and two output blocks (the consumer holds on to the previous block while the next is merged)
+def merged_blocks(run_paths, buffer_size):
+    block_size = max(1, buffer_size // (len(run_paths) + 3))
+    merged = heapq.merge(*(read_run(path, block_size) for path in run_paths))
+    while True:
+        block = array('q', islice(merged, block_size))
+        if len(block) == 0:
+            break
+        yield block
+
+
+# Read a sorted run (binary file) block by block
+def read_run(path, block_size):
+    with open(path, 'rb', buffering=0) as fp:  # unbuffered (the blocks are the buffers)
+        while True:
+            block = array('q')
+            try:
+                block.fromfile(fp, block_size)
+            except EOFError:
+                pass  # the last block is short (the integers read are still appended to the block)
+            if len(block) == 0:
+                break
+            yield from block
+
+
+def main():
+    script_path = os.path.realpath(__file__)
+    dir_path = os.path.dirname(script_path)
+    input_path = os.path.join(dir_path, 'problem5.6.txt')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, 'sorted.txt')
+        # NOTE: a tiny buffer (many runs) forces a multi-pass merge of the 10000 integers
+        external_sort(input_path, output_path, buffer_bytes=1600)
+        with open(output_path) as fp:
+            xs = [int(line) for line in fp]
+    is_sorted = all(xs[i] <= xs[i + 1] for i in range(len(xs) - 1))
+    print(f'The {len(xs)}-element file have been sorted externally: {is_sorted}')
+
+
+if __name__ == '__main__':
+    main()
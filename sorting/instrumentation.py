@@ -0,0 +1,72 @@
+# Opt-in operation counting for the hot paths of the algorithms (sorting, selection and multiplication)
+#
+# The instrumented functions look up the module attribute 'active' once per call, and only count when it is
+# not None. When instrumentation is disabled (the default) the overhead is a single attribute lookup and test
+# per call (and never per element), so it can stay in the code.
+#
+# usage:
+#     with instrumentation.instrument() as counters:
+#         merge_sort(xs)
+#     print(counters.report())
+#
+# NOTE: The counters are global (not thread-local), so only instrument one computation at a time
+# NOTE: The multiplication modules (in their own source roots) do not import this module, and do not look at 'active'.
+#       They count into Counters passed explicitly, e.g. karatsuba_multiplication(xs, ys, stats=counters)
+from contextlib import contextmanager
+
+active = None  # the Counters being reported to (None means disabled)
+
+
+class Counters:
+    def __init__(self):
+        self.comparisons = 0  # element comparisons
+        self.swaps = 0  # element swaps (in-place algorithms)
+        self.allocations = 0  # new lists (or matrices) allocated
+        self.multiplications = 0  # primitive (single digit or scalar) multiplications
+        self.calls = 0  # recursive calls
+        self.depth = 0  # current recursion depth
+        self.max_depth = 0  # maximum recursion depth
+        self.partitions = 0  # number of partitions
+        self.balance_sum = 0.0  # sum of the balance of all partitions
+        self.worst_balance = 0.5  # the worst (smallest) balance of any partition
+
+    def enter(self):
+        self.calls += 1
+        self.depth += 1
+        if self.depth > self.max_depth:
+            self.max_depth = self.depth
+
+    def leave(self):
+        self.depth -= 1
+
+    # the balance of a partition is the size of the smaller part relative to the size of both parts (0.0..0.5)
+    def partitioned(self, left, right):
+        balance = min(left, right) / max(left + right, 1)
+        self.partitions += 1
+        self.balance_sum += balance
+        if balance < self.worst_balance:
+            self.worst_balance = balance
+
+    def report(self):
+        return {
+            'comparisons': self.comparisons,
+            'swaps': self.swaps,
+            'allocations': self.allocations,
+            'multiplications': self.multiplications,
+            'calls': self.calls,
+            'max_depth': self.max_depth,
+            'partitions': self.partitions,
+            'average_balance': self.balance_sum / self.partitions if self.partitions > 0 else None,
+            'worst_balance': self.worst_balance if self.partitions > 0 else None,
+        }
+
+
+@contextmanager
+def instrument():
+    global active
+    previous = active
+    active = Counters()
+    try:
+        yield active
+    finally:
+        active = previous
@@ -1,3 +1,18 @@
+# standard library imports
+from array import array
+from bisect import (bisect_left, bisect_right)
+from itertools import chain
+from multiprocessing import Pool
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # NumPy is optional, and only needed by count_numpy
+
+# local imports (added as source root in pycharm)
+import instrumentation
+
+
 def count(xs):
     ys = xs[:]
     c = count_and_sort(ys, 0, len(ys))
@@ -54,15 +69,255 @@ def merge_and_count_split_inversions(xs, p, m, q):
             j += 1
             # the number of inversions are equal to the remaining elements in the left list
             c += n1 - i
+
+    stats = instrumentation.active
+    if stats is not None and n1 > 0 and n2 > 0:
+        # NOTE: the tail of the list that is not exhausted first is copied without comparisons
+        if left[-1] <= right[-1]:
+            tail = n2 - bisect_left(right, left[-1])
+        else:
+            tail = n1 - bisect_right(left, right[-1])
+        stats.comparisons += n1 + n2 - tail
+        stats.allocations += 2  # the copies of the two sub-lists
+    return c
+
+
+# Bottom-up (iterative) inversion counting without copying sub-lists
+#   * the input is copied once into a compact array of signed 64-bit integers, and we allocate one
+#     auxiliary array of the same size (about 2n machine words in total)
+#   * small blocks of BOTTOM_UP_WIDTH elements are first sorted using binary insertion sort, where
+#     every insertion counts the inversions it removes (the number of positions the element moves)
+#   * runs of width w, 2w, 4w, ... are merged from the source array into the destination array, and the
+#     two arrays swap roles after each pass (ping-pong)
+# NOTE: The elements must be integers that fit in a signed 64-bit integer (e.g. ranks)
+BOTTOM_UP_WIDTH = 32
+
+
+def count_bottom_up(xs):
+    c, _ = count_and_sort_bottom_up(xs)
+    return c
+
+
+# returns the number of inversions and the sorted array
+# NOTE: An auxiliary array('q') buffer of the same length can be passed in (and is overwritten)
+def count_and_sort_bottom_up(xs, buffer=None):
+    n = len(xs)
+    src = array('q', xs)
+    if buffer is None:
+        dst = array('q', bytes(8 * n))  # zero-filled auxiliary buffer
+    else:
+        assert len(buffer) == n
+        dst = buffer
+    c = 0
+    width = BOTTOM_UP_WIDTH
+    for p in range(0, n, width):
+        c += insertion_sort_and_count_inversions(src, p, min(p + width, n))
+    while width < n:
+        for p in range(0, n, 2 * width):
+            m = min(p + width, n)
+            q = min(p + 2 * width, n)
+            c += merge_into_and_count_split_inversions(src, dst, p, m, q)
+        src, dst = dst, src
+        width *= 2
+    return c, src
+
+
+def insertion_sort_and_count_inversions(xs, p, q):
+    c = 0
+    for i in range(p + 1, q):
+        x = xs[i]
+        # NOTE: bisect_right keeps equal elements in order (equal elements are not inversions)
+        pos = bisect_right(xs, x, p, i)
+        if pos < i:
+            xs[pos + 1:i + 1] = xs[pos:i]
+            xs[pos] = x
+            c += i - pos
     return c
 
 
+# Merge the two sorted runs src[p:m] and src[m:q] into dst[p:q] and count the split inversions
+def merge_into_and_count_split_inversions(src, dst, p, m, q):
+    i = p
+    j = m
+    k = p
+    c = 0
+    if i < m and j < q:
+        x = src[i]
+        y = src[j]
+        # NOTE: We only perform one store, index-increment and stop-criteria per loop-iteration
+        while True:
+            if x <= y:
+                dst[k] = x
+                k += 1
+                i += 1
+                if i >= m:
+                    break
+                x = src[i]
+            else:
+                dst[k] = y
+                k += 1
+                j += 1
+                # the number of inversions are equal to the remaining elements in the left run
+                c += m - i
+                if j >= q:
+                    break
+                y = src[j]
+    # copy the remaining tail of the run that is not exhausted (at most one of these is non-empty)
+    if i < m:
+        dst[k:q] = src[i:m]
+    elif j < q:
+        dst[k:q] = src[j:q]
+    return c
+
+
+# Batched inversion counting of many lists (e.g. the rows of a 2-D block of permutations)
+#   * the sorted array of every count is reused as the auxiliary buffer of the next count (of the same length)
+#   * with more than one process the lists are split into one chunk per process, that are counted in parallel
+#   * a 2-D NumPy block is counted by count_numpy_batch (processes is ignored)
+def count_batch(xss, processes=1):
+    if np is not None and isinstance(xss, np.ndarray) and xss.ndim == 2:
+        # a NumPy block is counted by the vectorized engine (all rows at once)
+        return count_numpy_batch(xss)
+    xss = list(xss)
+    if processes < 2 or len(xss) < 2:
+        return count_batch_serial(xss)
+    chunk_size = -(-len(xss) // processes)  # ceiling division
+    chunks = [xss[i:i + chunk_size] for i in range(0, len(xss), chunk_size)]
+    with Pool(processes) as pool:
+        return list(chain.from_iterable(pool.map(count_batch_serial, chunks)))
+
+
+def count_batch_serial(xss):
+    cs = []
+    buffer = None
+    for xs in xss:
+        if buffer is not None and len(buffer) != len(xs):
+            buffer = None
+        c, buffer = count_and_sort_bottom_up(xs, buffer)
+        cs.append(c)
+    return cs
+
+
+# Kendall-tau distance (the number of discordant pairs) between a reference ranking and many candidate rankings
+# of the same items, i.e. the number of inversions of every candidate relabeled by the positions in the reference
+def count_against(reference, candidates, processes=1):
+    position = {x: i for i, x in enumerate(reference)}
+    return count_batch(([position[x] for x in ys] for ys in candidates), processes)
+
+
+# Vectorized inversion counting using NumPy (a radix merge sort, where every pass is a few whole-array operations)
+#   * the values are mapped (order preserving) to small integers 0..u-1, where equal values are mapped to equal
+#     integers (integers with a range less than n are just offset by the minimum, otherwise we compute ranks)
+#   * the values are processed one bit at a time, from the most significant bit to the least significant bit
+#   * before processing bit b the values are (stably) ordered such that elements with the same prefix (the bits
+#     above bit b) form a contiguous group in their original order
+#   * an inversion of two elements, that first differ in bit b, is a 1-bit element before a 0-bit element in
+#     the same group (counted using cumulative sums of the bits)
+#   * finally all elements are (stably) partitioned on bit b (0-bit elements first), which keeps the elements of
+#     every group together, now grouped by the prefix including bit b
+# NOTE: The running time is O(n log(u)), but every pass runs without the Python interpreter overhead
+def count_numpy(xs):
+    if np is None:
+        raise ImportError('count_numpy requires NumPy.')
+    xs = np.asarray(xs).reshape(-1)
+    n = len(xs)
+    if n < 2:
+        return 0
+    dtype = np.int32 if n < 2 ** 31 else np.int64
+    x_min = int(xs.min())
+    x_max = int(xs.max())
+    if xs.dtype.kind in 'iu' and x_max - x_min < n:
+        vals = (xs.astype(np.int64) - x_min).astype(dtype)
+        u = x_max - x_min + 1
+    else:
+        _, vals = np.unique(xs, return_inverse=True)
+        vals = vals.reshape(-1).astype(dtype)
+        u = int(vals.max()) + 1
+    return int(count_bit_sliced(vals, u.bit_length(), 1)[0])
+
+
+# Vectorized inversion counting of every row of a 2-D block (rows x m) in a single bit-sliced pass
+#   * the values of every row are mapped (order preserving) to the ranks 0..u-1 within the row
+#   * the row index is put in the bits above the ranks, so the groups of count_numpy never mix elements of
+#     different rows, and the partitions are done within every row (such that every row stays in place)
+# Returns the list of the number of inversions of every row
+def count_numpy_batch(xss):
+    if np is None:
+        raise ImportError('count_numpy_batch requires NumPy.')
+    xss = np.asarray(xss)
+    rows, m = xss.shape
+    if rows == 0 or m < 2:
+        return [0] * rows
+    if xss.dtype.kind in 'iu':
+        # NOTE: the offsets are computed in 64-bit integers (narrow integer types would wrap around), and the span
+        #       as unsigned 64-bit integers (the span of int64 values may not fit in an int64)
+        row_min = xss.min(axis=1, keepdims=True).astype(np.int64)
+        row_max = xss.max(axis=1, keepdims=True).astype(np.int64)
+        span = int((row_max.astype(np.uint64) - row_min.astype(np.uint64)).max())
+    if xss.dtype.kind in 'iu' and span < m:
+        ranks = xss.astype(np.int64) - row_min
+    else:
+        # dense ranks within every row (equal values get equal ranks)
+        order = np.argsort(xss, axis=1, kind='stable')
+        xs_sorted = np.take_along_axis(xss, order, axis=1)
+        dense = np.zeros((rows, m), dtype=np.int64)
+        np.cumsum(xs_sorted[:, 1:] != xs_sorted[:, :-1], axis=1, out=dense[:, 1:])
+        ranks = np.empty_like(dense)
+        np.put_along_axis(ranks, order, dense, axis=1)
+    width = max(int(ranks.max()).bit_length(), 1)  # the number of bits of the ranks
+    n = rows * m
+    dtype = np.int32 if (rows << width) < 2 ** 31 and n < 2 ** 31 else np.int64
+    vals = ((np.arange(rows, dtype=np.int64)[:, None] << width) + ranks).reshape(-1).astype(dtype)
+    return [int(c) for c in count_bit_sliced(vals, width, rows)]
+
+
+# The bit-sliced passes of count_numpy over the bits width-1..0 of vals, where the bits above width are the row
+# index of every element (the rows have the same length, and are contiguous and in row order)
+# Returns an array of the number of inversions of every row
+# NOTE: With more than one row every row is partitioned separately, such that the rows stay in place
+def count_bit_sliced(vals, width, rows):
+    n = len(vals)
+    m = n // rows
+    dtype = vals.dtype
+    idx = np.arange(n, dtype=dtype)
+    row_start = idx - idx % m  # the index of the first element of the row of every element
+    is_start = np.ones(n, dtype=bool)
+    ones_cum = np.zeros(n + 1, dtype=dtype)  # ones_cum[i] = the number of 1-bits before index i
+    counts = np.zeros(rows, dtype=np.int64)
+    for b in range(width - 1, -1, -1):
+        # the first index of the group of every element
+        prefix = vals >> (b + 1)
+        np.not_equal(prefix[1:], prefix[:-1], out=is_start[1:])
+        start = np.maximum.accumulate(np.where(is_start, idx, 0))
+        # the number of 1-bit elements before every element (in the same group)
+        bits = (vals >> b) & 1
+        np.cumsum(bits, out=ones_cum[1:])
+        ones_before_global = ones_cum[:-1]
+        ones_before = ones_before_global - ones_cum[start]
+        # sum of ones_before over all 0-bit elements (of every row)
+        counts += (ones_before * (1 - bits)).reshape(rows, m).sum(axis=1, dtype=np.int64)
+        # stable partition (0-bit elements first) of every row
+        if rows == 1:
+            zeros_total = n - int(ones_cum[-1])
+            new_pos = np.where(bits == 0, idx - ones_before_global, zeros_total + ones_before_global)
+        else:
+            ones_before_in_row = ones_before_global - ones_cum[row_start]
+            zeros_in_row = m - (ones_cum[row_start + m] - ones_cum[row_start])
+            new_pos = np.where(bits == 0, idx - ones_before_in_row, row_start + zeros_in_row + ones_before_in_row)
+        new_vals = np.empty_like(vals)
+        new_vals[new_pos] = vals
+        vals = new_vals
+    return counts
+
+
 def main():
     x = [1, 2, 3, 4, 5, 6]
     x
     number_of_inversions = count(x)
     print(number_of_inversions)
     print(sort(x))
+    print(count_bottom_up(x))
+    print(count_against(x, [x, x[::-1], [2, 1, 3, 4, 6, 5]]))
 
 
 if __name__ == '__main__':
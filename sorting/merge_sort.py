@@ -1,4 +1,17 @@
-def merge_sort(xs):
+# standard library imports
+import os
+from bisect import (bisect_left, bisect_right)
+from multiprocessing import Pool
+
+# local imports (added as source root in pycharm)
+import instrumentation
+
+
+# key is a function computing the sort key of every element (computed exactly once per element)
+# reverse sorts in descending order (equal elements keep their original order, i.e. the sort is stable)
+def merge_sort(xs, key=None, reverse=False):
+    if key is not None or reverse:
+        return merge_sort_keyed(xs, key, reverse)
     l: int = len(xs)
     if l < 2:
         return xs
@@ -47,6 +60,11 @@ def merge(xs, ys):
             else:
                 y = ys[iy]
 
+    stats = instrumentation.active
+    if stats is not None:
+        # every loop-iteration performed one comparison (and consumed one element)
+        stats.comparisons += ix + iy
+        stats.allocations += 2  # the result and the (remaining) tail slice
     return rs
 
 # Pseudo Code from the book for Merge
@@ -78,8 +96,409 @@ def merge(xs, ys):
 # calculated as -2**63 = ~sys.maxsize, for same signed 64-bit integer.
 
 
+# Bottom-up (iterative) merge sort
+#   * small blocks of BOTTOM_UP_WIDTH elements are first sorted in place using binary insertion sort
+#   * no recursion: we merge runs of width w, 2w, 4w, ... until a single run covers the list
+#   * no slicing: every pass merges from a source list into a destination list, and the two lists
+#     swap roles after each pass (ping-pong), so we only ever allocate one auxiliary list of size n
+# The list xs is sorted in place (and returned for convenience), using 2n memory in total
+# buffer is an optional auxiliary list (or array) of at least n elements, such that one buffer can be reused to sort
+# many lists (e.g. the runs of external_sort)
+BOTTOM_UP_WIDTH = 32
+COPY_BLOCK = 4096
+
+
+def merge_sort_bottom_up(xs, buffer=None):
+    n = len(xs)
+    if n < 2:
+        return xs
+    width = BOTTOM_UP_WIDTH
+    for lo in range(0, n, width):
+        binary_insertion_sort(xs, lo, min(lo + width, n), lo + 1)
+    src = xs
+    dst = xs[:] if buffer is None else buffer  # the single auxiliary buffer (the content will be overwritten)
+    while width < n:
+        for lo in range(0, n, 2 * width):
+            mid = min(lo + width, n)
+            hi = min(lo + 2 * width, n)
+            merge_into(src, dst, lo, mid, hi)
+        src, dst = dst, src
+        width *= 2
+    # after an odd number of passes the sorted result lives in the auxiliary buffer
+    if src is not xs:
+        if buffer is None:
+            xs[:] = src
+        else:
+            # NOTE: copy in blocks, because the buffer may be longer than xs (and src[:n] would copy all of it)
+            for lo in range(0, n, COPY_BLOCK):
+                xs[lo:min(lo + COPY_BLOCK, n)] = src[lo:min(lo + COPY_BLOCK, n)]
+    return xs
+
+
+# Merge the two sorted runs src[lo:mid] and src[mid:hi] into dst[lo:hi]
+# NOTE: on ties we take the element from the left run first (the merge is stable)
+def merge_into(src, dst, lo, mid, hi):
+    i = lo
+    j = mid
+    k = lo
+    if i < mid and j < hi:
+        x = src[i]
+        y = src[j]
+        while True:
+            if y < x:
+                dst[k] = y
+                k += 1
+                j += 1
+                if j >= hi:
+                    break
+                y = src[j]
+            else:
+                dst[k] = x
+                k += 1
+                i += 1
+                if i >= mid:
+                    break
+                x = src[i]
+    # copy the remaining tail of the run that is not exhausted (at most one of these is non-empty)
+    if i < mid:
+        dst[k:hi] = src[i:mid]
+    elif j < hi:
+        dst[k:hi] = src[j:hi]
+
+
+# Decorate-sort-undecorate merge sort using parallel arrays (no tuple wrappers)
+#   * the keys are computed once, and the keys and values are merged side by side (bottom-up with ping-pong buffers),
+#     such that only the keys are compared
+#   * reverse (descending) order is obtained by sorting the reversed input and reversing the (stably) sorted result,
+#     which keeps equal elements in their original order
+def merge_sort_keyed(xs, key=None, reverse=False):
+    vs = xs[::-1] if reverse else xs[:]
+    if key is None:
+        # the values are the keys
+        merge_sort_bottom_up(vs)
+    else:
+        n = len(vs)
+        ks = [key(v) for v in vs]
+        k_src, v_src = ks, vs
+        k_dst, v_dst = ks[:], vs[:]
+        width = 1
+        while width < n:
+            for lo in range(0, n, 2 * width):
+                mid = min(lo + width, n)
+                hi = min(lo + 2 * width, n)
+                merge_into_keyed(k_src, v_src, k_dst, v_dst, lo, mid, hi)
+            k_src, k_dst = k_dst, k_src
+            v_src, v_dst = v_dst, v_src
+            width *= 2
+        vs = v_src
+    if reverse:
+        vs.reverse()
+    return vs
+
+
+# Merge the sorted runs [lo:mid] and [mid:hi] of the parallel arrays (keys and values) into the destination arrays
+# NOTE: on ties we take the element from the left run first (the merge is stable)
+def merge_into_keyed(k_src, v_src, k_dst, v_dst, lo, mid, hi):
+    i = lo
+    j = mid
+    k = lo
+    if i < mid and j < hi:
+        x = k_src[i]
+        y = k_src[j]
+        while True:
+            if y < x:
+                k_dst[k] = y
+                v_dst[k] = v_src[j]
+                k += 1
+                j += 1
+                if j >= hi:
+                    break
+                y = k_src[j]
+            else:
+                k_dst[k] = x
+                v_dst[k] = v_src[i]
+                k += 1
+                i += 1
+                if i >= mid:
+                    break
+                x = k_src[i]
+    # copy the remaining tail of the run that is not exhausted (at most one of these is non-empty)
+    if i < mid:
+        k_dst[k:hi] = k_src[i:mid]
+        v_dst[k:hi] = v_src[i:mid]
+    elif j < hi:
+        k_dst[k:hi] = k_src[j:hi]
+        v_dst[k:hi] = v_src[j:hi]
+
+
+# Run-adaptive (natural) merge sort (a simplified timsort)
+#   * the list is scanned left to right for runs that are already sorted (strictly descending runs are
+#     reversed in place, non-descending runs are kept as they are)
+#   * short runs are extended to MIN_RUN elements using binary insertion sort
+#   * runs are pushed on a stack, and merged such that the run lengths on the stack stay balanced
+#     (roughly growing like the fibonacci numbers from top to bottom)
+#   * merging gallops (exponential search) when one of the runs keeps winning
+# A list that is already sorted (or reverse sorted) is a single run, and is sorted in linear time.
+# The list xs is sorted in place (and returned for convenience)
+MIN_RUN = 32
+MIN_GALLOP = 7
+
+
+def natural_merge_sort(xs):
+    n = len(xs)
+    if n < 2:
+        return xs
+    min_run = min_run_length(n)
+    runs = []  # stack of (start, length) pairs
+    lo = 0
+    while lo < n:
+        run_hi = count_run_and_make_ascending(xs, lo, n)
+        if run_hi - lo < min_run:
+            # extend the short run to min_run elements (or the rest of the list)
+            force_hi = min(lo + min_run, n)
+            binary_insertion_sort(xs, lo, force_hi, run_hi)
+            run_hi = force_hi
+        runs.append((lo, run_hi - lo))
+        merge_collapse(xs, runs)
+        lo = run_hi
+    # merge all remaining runs on the stack
+    while len(runs) > 1:
+        i = len(runs) - 2
+        if i > 0 and runs[i - 1][1] < runs[i + 1][1]:
+            i -= 1
+        merge_at(xs, runs, i)
+    return xs
+
+
+# The minimum run length is chosen in the range MIN_RUN/2..MIN_RUN, such that n/min_run is (close to)
+# a power of 2 (because merging is most efficient when the runs have equal length)
+def min_run_length(n):
+    r = 0
+    while n >= MIN_RUN:
+        r |= n & 1
+        n >>= 1
+    return n + r
+
+
+# Returns the (exclusive) end index of the run starting at lo
+def count_run_and_make_ascending(xs, lo, hi):
+    run_hi = lo + 1
+    if run_hi == hi:
+        return hi
+    if xs[run_hi] < xs[lo]:
+        # NOTE: the run must be strictly descending, otherwise reversing it breaks stability
+        run_hi += 1
+        while run_hi < hi and xs[run_hi] < xs[run_hi - 1]:
+            run_hi += 1
+        reverse_range(xs, lo, run_hi)
+    else:
+        run_hi += 1
+        while run_hi < hi and not xs[run_hi] < xs[run_hi - 1]:
+            run_hi += 1
+    return run_hi
+
+
+def reverse_range(xs, lo, hi):
+    hi -= 1
+    while lo < hi:
+        xs[lo], xs[hi] = xs[hi], xs[lo]
+        lo += 1
+        hi -= 1
+
+
+# Sort xs[lo:hi] given that the prefix xs[lo:start] is already sorted
+def binary_insertion_sort(xs, lo, hi, start):
+    for i in range(start, hi):
+        x = xs[i]
+        # NOTE: bisect_right keeps equal elements in their original order (stable)
+        pos = bisect_right(xs, x, lo, i)
+        xs[pos + 1:i + 1] = xs[pos:i]
+        xs[pos] = x
+
+
+# Merge runs until the following invariants hold for the run lengths on top of the stack
+#   1. runs[i - 2] > runs[i - 1] + runs[i]
+#   2. runs[i - 1] > runs[i]
+# NOTE: The invariants are checked for the top 4 runs (checking only the top 3 runs is a well-known bug)
+def merge_collapse(xs, runs):
+    while len(runs) > 1:
+        i = len(runs) - 2
+        if (i > 0 and runs[i - 1][1] <= runs[i][1] + runs[i + 1][1]) or \
+                (i > 1 and runs[i - 2][1] <= runs[i - 1][1] + runs[i][1]):
+            if runs[i - 1][1] < runs[i + 1][1]:
+                i -= 1
+        elif runs[i][1] > runs[i + 1][1]:
+            break
+        merge_at(xs, runs, i)
+
+
+# Merge the two adjacent runs at index i and i+1 of the stack
+def merge_at(xs, runs, i):
+    lo, len1 = runs[i]
+    mid, len2 = runs[i + 1]
+    runs[i] = (lo, len1 + len2)
+    del runs[i + 1]
+    gallop_merge(xs, lo, mid, mid + len2)
+
+
+# Merge the two sorted (adjacent) runs xs[lo:mid] and xs[mid:hi] in place (using a copy of the left run)
+def gallop_merge(xs, lo, mid, hi):
+    # elements of the left run not greater than the first element of the right run are already in place
+    lo = bisect_right(xs, xs[mid], lo, mid)
+    if lo == mid:
+        return
+    # elements of the right run not less than the last element of the left run are already in place
+    hi = bisect_left(xs, xs[mid - 1], mid, hi)
+
+    tmp = xs[lo:mid]
+    n1 = len(tmp)
+    i = 0  # tmp's index
+    j = mid  # right run's index
+    k = lo  # destination index
+    while i < n1 and j < hi:
+        # one-pair-at-a-time mode, until one of the runs wins MIN_GALLOP times in a row
+        count_left = 0
+        count_right = 0
+        while i < n1 and j < hi:
+            if xs[j] < tmp[i]:
+                xs[k] = xs[j]
+                j += 1
+                count_right += 1
+                count_left = 0
+            else:
+                xs[k] = tmp[i]
+                i += 1
+                count_left += 1
+                count_right = 0
+            k += 1
+            if count_left >= MIN_GALLOP or count_right >= MIN_GALLOP:
+                break
+        # galloping mode, as long as the blocks being moved are long
+        while i < n1 and j < hi:
+            # all left elements not greater than xs[j] are moved in one block
+            e = gallop_right(xs[j], tmp, i, n1)
+            count_left = e - i
+            xs[k:k + count_left] = tmp[i:e]
+            k += count_left
+            i = e
+            if i >= n1:
+                break
+            # all right elements less than tmp[i] are moved in one block
+            e = gallop_left(tmp[i], xs, j, hi)
+            count_right = e - j
+            xs[k:k + count_right] = xs[j:e]
+            k += count_right
+            j = e
+            if count_left < MIN_GALLOP and count_right < MIN_GALLOP:
+                break
+    # NOTE: if the right run is exhausted the remaining left elements must be copied back, otherwise the
+    #       remaining right elements are already in place
+    if i < n1:
+        xs[k:k + n1 - i] = tmp[i:n1]
+
+
+# Exponential search starting at xs[lo] followed by a binary search
+# Returns the first index in lo..hi-1 with xs[index] > key (or hi)
+def gallop_right(key, xs, lo, hi):
+    prev = lo
+    i = lo
+    ofs = 1
+    while i < hi and not key < xs[i]:
+        prev = i + 1
+        i = lo + ofs
+        ofs *= 2
+    return bisect_right(xs, key, prev, min(i, hi))
+
+
+# Exponential search starting at xs[lo] followed by a binary search
+# Returns the first index in lo..hi-1 with xs[index] >= key (or hi)
+def gallop_left(key, xs, lo, hi):
+    prev = lo
+    i = lo
+    ofs = 1
+    while i < hi and xs[i] < key:
+        prev = i + 1
+        i = lo + ofs
+        ofs *= 2
+    return bisect_left(xs, key, prev, min(i, hi))
+
+
+# Parallel merge sort using a pool of worker processes
+#   * the list is split into one chunk per process, and the chunks are sorted in parallel
+#   * splitters (keys) are chosen from a regular sample of the sorted chunks (sample sort), and split every sorted
+#     chunk into one slice per key range (using binary search)
+#   * every worker merges the slices of one key range (a k-way merge), and the merged key ranges are concatenated
+# Every element is pickled to and from the workers twice (once per phase), and the work in this process is only the
+# sampling, the binary searches and the concatenation (no merge of the whole list in a single process)
+# NOTE: The sort is stable (the chunks are sorted stably, and the slices are merged stably in chunk order)
+# Lists shorter than threshold are sorted serially, because starting the pool and pickling the chunks
+# to and from the workers only pays off for large lists
+PARALLEL_THRESHOLD = 100000
+OVERSAMPLING = 32  # the number of samples per chunk and key range
+
+
+def parallel_merge_sort(xs, processes=None, threshold=PARALLEL_THRESHOLD):
+    if processes is None:
+        processes = os.cpu_count() or 1
+    n = len(xs)
+    if n < 2 or n < threshold or processes < 2:
+        return merge_sort(xs)
+    chunk_size = -(-n // processes)  # ceiling division
+    chunks = [xs[i:i + chunk_size] for i in range(0, n, chunk_size)]
+    with Pool(processes) as pool:
+        runs = pool.map(merge_sort_bottom_up, chunks)
+        del chunks
+        splitters = choose_splitters(runs, processes)
+        # the bounds of the slice of every key range in every run (the keys equal to a splitter go to the right)
+        bounds = [[0] + [bisect_left(run, s) for s in splitters] + [len(run)] for run in runs]
+        key_ranges = [[run[b[j]:b[j + 1]] for run, b in zip(runs, bounds)] for j in range(len(splitters) + 1)]
+        del runs
+        merged = pool.map(merge_runs, key_ranges)
+    ys = []
+    for m in merged:
+        ys.extend(m)
+    return ys
+
+
+# returns the (processes - 1) splitters at the quantiles of a regular sample of the sorted runs
+def choose_splitters(runs, processes):
+    sample = []
+    for run in runs:
+        step = max(len(run) // (OVERSAMPLING * processes), 1)
+        sample.extend(run[step // 2::step])
+    sample.sort()
+    return [sample[j * len(sample) // processes] for j in range(1, processes)]
+
+
+# stable k-way merge of sorted runs (used by the workers of parallel_merge_sort)
+# NOTE: Adjacent runs are merged pairwise (using merge_into and ping-pong buffers) in ceil(log2(k)) rounds
+def merge_runs(runs):
+    src = []
+    bounds = [0]  # run i is src[bounds[i]:bounds[i + 1]]
+    for run in runs:
+        src.extend(run)
+        bounds.append(len(src))
+    dst = src[:]
+    while len(bounds) > 2:
+        next_bounds = [0]
+        for i in range(0, len(bounds) - 2, 2):
+            merge_into(src, dst, bounds[i], bounds[i + 1], bounds[i + 2])
+            next_bounds.append(bounds[i + 2])
+        if len(bounds) % 2 == 0:
+            # an odd number of runs: the last run is copied as is
+            dst[bounds[-2]:bounds[-1]] = src[bounds[-2]:bounds[-1]]
+            next_bounds.append(bounds[-1])
+        src, dst = dst, src
+        bounds = next_bounds
+    return src
+
+
 def main():
     print(f'{merge_sort([3, 5, 7, 2, 8, 1, 4, 6])}')
+    print(f'{merge_sort_bottom_up([3, 5, 7, 2, 8, 1, 4, 6])}')
+    print(f'{natural_merge_sort([3, 5, 7, 2, 8, 1, 4, 6])}')
+    print(f'{merge_sort([3, 5, 7, 2, 8, 1, 4, 6], key=lambda x: x % 4, reverse=True)}')
+    print(f'{parallel_merge_sort([3, 5, 7, 2, 8, 1, 4, 6], processes=2, threshold=0)}')
 
 
 if __name__ == "__main__":
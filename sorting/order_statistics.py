@@ -1,41 +1,303 @@
-from common import (partition, choose_pivot_randomly)
+# standard library imports
+import heapq
+import math
+import random
+from bisect import bisect_left
+
+# local imports (added as source root in pycharm)
+import instrumentation
+from common import (partition, choose_pivot_randomly, three_way_partition, insertion_sort_range,
+                    dual_pivot_partition_skewed, squeeze_pivots, choose_pivot_median_of_three)
+from quick_sort import (intro_sort, probe_pivot_duplicates)
 
 
 # order is 1-based (1, 2, ..., n)
-def rselect(xs, order):
+# strategy is the name of the selection algorithm (see SELECT_STRATEGIES)
+def rselect(xs, order, strategy='random'):
     ys = xs[:]
-    return random_select(ys, order - 1, 0, len(ys))
+    return SELECT_STRATEGIES[strategy](ys, order - 1, 0, len(ys))
 
 
 # This is a randomized algorithm with different (stochastic) recursion path on each execution
 # index is 0-based
 # NOTE: When we use a range(l, h), then the pivot index will always be the (zero-based) order of the entire array
 def random_select(xs, index, l, h):
+    stats = instrumentation.active
+    if stats is not None:
+        stats.enter()
     p = choose_pivot_randomly(l, h)
     # calculate the position of the pivot
     pivot_index = partition(xs, l, h, p)
     if pivot_index == index:
-        return xs[pivot_index]
+        result = xs[pivot_index]
     elif pivot_index > index:
         # search the first group of smaller elements l..p-1
-        return random_select(xs, index, l, pivot_index)
+        result = random_select(xs, index, l, pivot_index)
     else:
         # search the second group of larger elements p+1,...,h-1
-        return random_select(xs, index, pivot_index + 1, h)
+        result = random_select(xs, index, pivot_index + 1, h)
+    if stats is not None:
+        stats.leave()
+    return result
+
+
+# order is 1-based (1, 2, ..., n)
+def rselect_three_way(xs, order):
+    ys = xs[:]
+    return random_select_three_way(ys, order - 1, 0, len(ys))
+
+
+# Randomized selection using three-way partition (for inputs with many duplicate keys)
+# NOTE: If the index falls in the block of elements equal to the pivot we are done, otherwise we continue in the
+#       part with the smaller (or larger) elements (the equal block is skipped entirely)
+def random_select_three_way(xs, index, l, h):
+    while True:
+        p = choose_pivot_randomly(l, h)
+        lt, gt = three_way_partition(xs, l, h, p)
+        if index < lt:
+            h = lt
+        elif index >= gt:
+            l = gt
+        else:
+            return xs[index]
+
+
+# order is 1-based (1, 2, ..., n)
+def dselect(xs, order):
+    ys = xs[:]
+    return deterministic_select(ys, order - 1, 0, len(ys))
 
 
-# TODO: Implement DSelect
+# DSelect: deterministic selection with worst-case linear running time
 #   ChoosePivot
 #       group/partition the array into n/5 sub-problems
 #       insertion-sort each sub-problem and calculate the median
 #       recursively call DSelect on the new (n/5)-element array of medians calculating the n/10 median
-#   From here we follow rselect
+#   From here we follow rselect (but iteratively and using three-way partition, such that duplicates are handled)
+# NOTE: The median of medians is guaranteed to have at least 30% of the elements on both sides, and the only
+#       recursion is the pivot selection on n/5 medians (recursion depth is log5(n))
+def deterministic_select(xs, index, l, h):
+    while h - l > 5:
+        p = median_of_medians(xs, l, h)
+        lt, gt = three_way_partition(xs, l, h, p)
+        if index < lt:
+            h = lt
+        elif index >= gt:
+            l = gt
+        else:
+            return xs[index]
+    insertion_sort_range(xs, l, h)
+    return xs[index]
+
+
+# returns the index of the median of medians of the range(l, h)
+# NOTE: The medians of the groups of 5 elements are moved to the front of the range xs[l..m-1] (in-place)
+def median_of_medians(xs, l, h):
+    m = l
+    for i in range(l, h, 5):
+        j = min(i + 5, h)
+        insertion_sort_range(xs, i, j)
+        mid = (i + j - 1) // 2
+        xs[m], xs[mid] = xs[mid], xs[m]
+        m += 1
+    mid = (l + m - 1) // 2
+    deterministic_select(xs, mid, l, m)
+    return mid
+
+
+# order is 1-based (1, 2, ..., n)
+def introselect(xs, order):
+    ys = xs[:]
+    return intro_select(ys, order - 1, 0, len(ys))
+
+
+# Introselect: hybrid of randomized and deterministic selection
+# We start out with random pivots (fast on average), but if the range has not been halved within
+# INTRO_SELECT_PATIENCE partitions, we fall back to DSelect (bounding the worst-case running time to be linear)
+# NOTE: When selecting the median a single partition can never halve the range, so the patience must be a few
+#       partitions (with 6 partitions the fallback rarely happens for random pivots)
+INTRO_SELECT_PATIENCE = 6
+
+
+def intro_select(xs, index, l, h):
+    checkpoint_size = h - l
+    attempts = 0
+    while h - l > 5:
+        if attempts == INTRO_SELECT_PATIENCE:
+            return deterministic_select(xs, index, l, h)
+        p = choose_pivot_randomly(l, h)
+        lt, gt = three_way_partition(xs, l, h, p)
+        if index < lt:
+            h = lt
+        elif index >= gt:
+            l = gt
+        else:
+            return xs[index]
+        attempts += 1
+        if 2 * (h - l) <= checkpoint_size:
+            # progress: the range has been (at least) halved
+            checkpoint_size = h - l
+            attempts = 0
+    insertion_sort_range(xs, l, h)
+    return xs[index]
+
+
+# Floyd-Rivest selection (for large n)
+#   * a random sample of n^(2/3) / 2 elements is sorted, and two pivots are chosen from the sample just below and just
+#     above the (scaled) index, such that the pivots bracket the order statistic with high probability
+#   * a single dual-pivot partition then reduces the range to the (small) range between the two pivots, where every
+#     element is compared first with the pivot on the far side of the index (most elements are on that side)
+# This uses about n + min(index, n - index) comparisons plus lower-order terms (sorting the sample, and the second
+# round on the range between the pivots), where random_select uses about 3.4n comparisons
+# (e.g. 1.16n, 1.27n and 1.67n at the indices n/100, n/10 and n/2 of 10^6 distinct elements)
+# NOTE: Small ranges (at most FLOYD_RIVEST_CUTOFF elements) are handled by random_select_three_way
+FLOYD_RIVEST_CUTOFF = 600
+
+
+def floyd_rivest_select(xs, index, l, h):
+    while h - l > FLOYD_RIVEST_CUTOFF:
+        n = h - l
+        s = int(n ** (2 / 3) / 2)  # the sample size
+        gap = int(math.sqrt(s * math.log(n)) / 2)  # the distance of the pivots from the scaled index in the sample
+        sample = sorted(random.sample(range(l, h), s), key=xs.__getitem__)
+        r = (index - l) * s // n
+        p = sample[max(r - gap, 0)]
+        q = sample[min(r + gap, s - 1)]
+        lt, gt, _ = dual_pivot_partition_skewed(xs, l, h, p, q, right_first=2 * (index - l) < n)
+        if index < lt:
+            h = lt
+        elif index > gt:
+            l = gt + 1
+        elif index == lt or index == gt or xs[lt] == xs[gt]:
+            # NOTE: if the two pivots are equal all the elements between them are equal too
+            return xs[index]
+        else:
+            # the elements equal to either pivot are moved out of the range between the pivots, otherwise many
+            # duplicates of the pivots would only shrink the range by the 2 pivots per iteration (the squeeze is only
+            # done if a probe finds a duplicate, as it costs 2 comparisons per element of the range)
+            _, duplicates = probe_pivot_duplicates(xs, lt + 1, gt, xs[lt], xs[gt])
+            if duplicates:
+                l, h, _ = squeeze_pivots(xs, lt + 1, gt, xs[lt], xs[gt])
+                if index < l:
+                    return xs[lt]
+                elif index >= h:
+                    return xs[gt]
+            else:
+                l, h = lt + 1, gt
+    return random_select_three_way(xs, index, l, h)
+
+
+# orders are 1-based (1, 2, ..., n), and the order statistics are returned in the same order as the orders
+# NOTE: We copy the list once for all the orders (and partition the copy only once at the top level)
+def multiselect(xs, orders):
+    n = len(xs)
+    for order in orders:
+        if not 1 <= order <= n:
+            raise ValueError(f'The order {order} is not in the range 1..{n}.')
+    ys = xs[:]
+    indices = sorted(set(order - 1 for order in orders))
+    multi_select(ys, indices, 0, len(indices), 0, len(ys))
+    # every requested index now holds its order statistic (as a pivot of some partition)
+    return [ys[order - 1] for order in orders]
+
+
+# Randomized selection of many (sorted, 0-based) indices[a..b-1] within the range(l, h)
+# NOTE: After the three-way partition the indices are split into the indices left of, equal to and right of the
+#       pivot, and we only search sub-ranges that contain requested indices. With k indices the recursion tree has
+#       about k leaves, so the running time is O(n log k) instead of the O(k n) running time of k separate calls
+#       to rselect
+# NOTE: All the indices of the elements equal to the pivot are resolved at once (e.g. for low-cardinality data)
+def multi_select(xs, indices, a, b, l, h):
+    # recurse on the smaller side and loop on the larger side (recursion depth is at most log2(n))
+    while a < b and h - l > 1:
+        p = choose_pivot_randomly(l, h)
+        lt, gt = three_way_partition(xs, l, h, p)
+        # the indices less than lt (smaller elements), and the indices from gt (larger elements)
+        m1 = bisect_left(indices, lt, a, b)
+        m2 = bisect_left(indices, gt, m1, b)
+        if lt - l < h - gt:
+            multi_select(xs, indices, a, m1, l, lt)
+            a, l = m2, gt
+        else:
+            multi_select(xs, indices, m2, b, gt, h)
+            b, h = m1, lt
+
+
+# Top-k (partial sort): the k smallest elements of xs in sorted order
+#   * quickselect (with three-way partition) moves the k smallest elements to the front of a copy of xs
+#   * only the k-element prefix is sorted (using introsort)
+# This takes O(n + k log k) time
+def partial_sort(xs, k):
+    ys = xs[:]
+    n = len(ys)
+    k = min(k, n)
+    if k <= 0:
+        return []
+    random_select_three_way(ys, k - 1, 0, n)
+    sort_range(ys, 0, k)
+    return ys[:k]
+
+
+# the k largest elements of xs in (descending) sorted order
+def partial_sort_largest(xs, k):
+    ys = xs[:]
+    n = len(ys)
+    k = min(k, n)
+    if k <= 0:
+        return []
+    random_select_three_way(ys, n - k, 0, n)
+    sort_range(ys, n - k, n)
+    return ys[n - k:][::-1]
+
+
+def sort_range(xs, l, h):
+    intro_sort(xs, l, h, 0, lambda zs, a, b: choose_pivot_median_of_three(zs, a, b), 2 * (h - l).bit_length())
+
+
+# the k smallest items of an iterable (e.g. a stream) in sorted order
+# NOTE: For streams heapq keeps a bounded max-heap of the k smallest items seen so far (the root is the largest of
+#       them), so the memory is O(k) and the time is O(n log k)
+def nsmallest(iterable, k):
+    if isinstance(iterable, list):
+        return partial_sort(iterable, k)
+    return heapq.nsmallest(k, iterable)
+
+
+# the k largest items of an iterable (e.g. a stream) in (descending) sorted order
+# NOTE: For streams heapq keeps a bounded min-heap of the k largest items seen so far (the root is the smallest of
+#       them), so the memory is O(k) and the time is O(n log k)
+def nlargest(iterable, k):
+    if isinstance(iterable, list):
+        return partial_sort_largest(iterable, k)
+    return heapq.nlargest(k, iterable)
+
+
+SELECT_STRATEGIES = {
+    'random': random_select,
+    'three_way': random_select_three_way,
+    'deterministic': deterministic_select,
+    'intro': intro_select,
+    'floyd_rivest': floyd_rivest_select,
+}
 
 
 def main():
     xs = [3, 7, 2, 8, 4, 1, 5, 6]
     order = 3
     print(f'The {order}. order statistics of {xs} is {rselect(xs, order)}')
+    print(f'The {order}. order statistics of {xs} is {rselect_three_way(xs, order)}')
+    print(f'The {order}. order statistics of {xs} is {dselect(xs, order)}')
+    print(f'The {order}. order statistics of {xs} is {introselect(xs, order)}')
+    print(f'The {order}. order statistics of {xs} is {rselect(xs, order, "floyd_rivest")}')
+    # low-cardinality data (many duplicates)
+    rolls = [random.randint(1, 6) for _ in range(100000)]
+    order = len(rolls) // 2
+    print(f'The median of {len(rolls)} dice rolls is {rselect(rolls, order, "floyd_rivest")} '
+          f'(and {rselect(rolls, order, "three_way")} using three-way partition)')
+    orders = [2, 4, 8]
+    print(f'The {orders} order statistics of {xs} are {multiselect(xs, orders)}')
+    print(f'The 3 smallest elements of {xs} are {nsmallest(xs, 3)}')
+    print(f'The 3 largest elements of {xs} are {nlargest(iter(xs), 3)}')
 
 
 if __name__ == '__main__':
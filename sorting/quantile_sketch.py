@@ -0,0 +1,120 @@
+# standard library imports
+import math
+import random
+
+# local imports (added as source root in pycharm)
+from order_statistics import rselect
+from quick_sort import load_list
+
+# Streaming (approximate) quantiles using a KLL sketch (Karnin, Lang and Liberty)
+#   * the sketch is a hierarchy of compactors (buffers), where an item at level h represents 2^h stream items
+#   * when a level is full it is sorted, and every other item (random odd or even offset) is promoted to the next
+#     level, while the rest are discarded (the total weight is preserved)
+#   * the capacity of the levels shrinks geometrically (by a factor C) from the top level down to the bottom level,
+#     so the memory is O(k) items (only growing with the log of the stream length through the number of levels)
+# The rank error of a quantile is (with high probability) about ERROR_FACTOR / k of the stream length
+# NOTE: Sketches of the same k can be merged (e.g. sketches computed by worker processes, since sketches pickle)
+DEFAULT_K = 200
+C = 2 / 3
+ERROR_FACTOR = 1.65
+
+
+# the smallest k with a rank error of (about) epsilon
+def k_for_error(epsilon):
+    return max(int(math.ceil(ERROR_FACTOR / epsilon)), 2)
+
+
+class KllSketch:
+    def __init__(self, k=DEFAULT_K):
+        self.k = k
+        self.n = 0  # the number of items in the stream (the total weight)
+        self.size = 0  # the number of items retained in the compactors
+        self.max_size = 0
+        self.compactors = []
+        self._grow()
+
+    def update(self, x):
+        self.compactors[0].append(x)
+        self.n += 1
+        self.size += 1
+        if self.size >= self.max_size:
+            self._compress()
+
+    def merge(self, other):
+        assert self.k == other.k
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for h, level in enumerate(other.compactors):
+            self.compactors[h].extend(level)
+        self.n += other.n
+        self.size = sum(len(level) for level in self.compactors)
+        while self.size >= self.max_size:
+            self._compress()
+        return self
+
+    # q is in the range 0.0..1.0 (e.g. 0.5 is the median)
+    def quantile(self, q):
+        if self.n == 0:
+            raise ValueError('The sketch is empty.')
+        items = sorted((x, 1 << h) for h, level in enumerate(self.compactors) for x in level)
+        target = q * self.n
+        cum_weight = 0
+        for x, weight in items:
+            cum_weight += weight
+            if cum_weight >= target:
+                return x
+        return items[-1][0]
+
+    # the (approximate) number of items in the stream less than or equal to x
+    def rank(self, x):
+        return sum(len([y for y in level if not x < y]) << h for h, level in enumerate(self.compactors))
+
+    def _capacity(self, h):
+        height = len(self.compactors)
+        return max(int(math.ceil(self.k * C ** (height - h - 1))), 2)
+
+    def _grow(self):
+        self.compactors.append([])
+        self.max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    # compact the lowest level that is full
+    def _compress(self):
+        for h in range(len(self.compactors)):
+            if len(self.compactors[h]) >= self._capacity(h):
+                if h + 1 == len(self.compactors):
+                    self._grow()
+                level = self.compactors[h]
+                level.sort()
+                # NOTE: for an odd number of items one item stays behind (the total weight must be preserved)
+                kept = level.pop() if len(level) % 2 == 1 else None
+                promoted = level[random.randint(0, 1)::2]
+                self.compactors[h + 1].extend(promoted)
+                self.size -= len(level) - len(promoted)
+                level.clear()
+                if kept is not None:
+                    level.append(kept)
+                break
+
+
+def main():
+    # accuracy check against rselect (exact order statistics) on the data from the book website
+    xs = load_list('problem5.6.txt')
+    n = len(xs)
+    # 4 'workers' each sketch a part of the stream, and the sketches are merged
+    sketches = [KllSketch() for _ in range(4)]
+    for i, x in enumerate(xs):
+        sketches[i % 4].update(x)
+    sketch = sketches[0]
+    for other in sketches[1:]:
+        sketch.merge(other)
+    print(f'The sketch retains {sketch.size} of {sketch.n} items (expected rank error {ERROR_FACTOR / sketch.k:.4f})')
+    for q in [0.01, 0.1, 0.5, 0.9, 0.99]:
+        order = max(int(math.ceil(q * n)), 1)
+        exact = rselect(xs, order)
+        approx = sketch.quantile(q)
+        rank = sum(1 for x in xs if x <= approx)
+        print(f'quantile({q}) = {approx} (exact {exact}), rank error {abs(rank - order) / n:.4f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,10 +2,18 @@
 # import pathlib
 # import sys
 import os
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # NumPy is optional, and only needed by load_ints(filename, 'numpy')
 
 # local imports (added as source root in pycharm)
 # sys.path.insert(0, str(pathlib.Path(__file__).parent))
-from common import (partition, choose_pivot_randomly, choose_pivot_median_of_three)
+from common import (partition, choose_pivot_randomly, choose_pivot_median_of_three, insertion_sort_range, heap_sort,
+                    three_way_partition, dual_pivot_partition, choose_pivots_tertiles, choose_pivots_randomly,
+                    squeeze_pivots, partition_keyed)
 
 
 # from . import common
@@ -60,6 +68,148 @@ def quick_sort(xs, l, h, count, pivot_fn):
         return count3
 
 
+# Quick sort using three-way partition (for inputs with many duplicate keys)
+# NOTE: The elements equal to the pivot are excluded from the recursive calls, so an input with only k distinct
+#       keys is sorted in O(n log k) time
+# NOTE: The comparisons are counted exactly: the three-way partition compares every element (including the pivot)
+#       once with the pivot, and every element not less than the pivot twice
+def sort_three_way(xs, pivot_fn=None):
+    if pivot_fn is None:
+        pivot_fn = lambda zs, l, h: choose_pivot_randomly(l, h)
+    ys = xs[:]
+    comparisons = quick_sort_three_way(ys, 0, len(ys), 0, pivot_fn)
+    return ys, comparisons
+
+
+def quick_sort_three_way(xs, l, h, count, pivot_fn):
+    # recurse on the smaller side and loop on the larger side (recursion depth is at most log2(n))
+    while h - l > 1:
+        pivot_index = pivot_fn(xs, l, h)
+        lt, gt = three_way_partition(xs, l, h, pivot_index)
+        count += (lt - l) + 2 * (h - lt)
+        if lt - l < h - gt:
+            count = quick_sort_three_way(xs, l, lt, count, pivot_fn)
+            l = gt
+        else:
+            count = quick_sort_three_way(xs, gt, h, count, pivot_fn)
+            h = lt
+    return count
+
+
+# Dual-pivot quick sort (the pivot strategy returns the indices of the two pivots)
+# NOTE: The comparisons are counted exactly by the dual-pivot partition sub-routine
+def sort_dual_pivot(xs, pivots_fn=None):
+    if pivots_fn is None:
+        pivots_fn = lambda zs, l, h: choose_pivots_tertiles(l, h)
+    ys = xs[:]
+    comparisons = dual_pivot_quick_sort(ys, 0, len(ys), 0, pivots_fn)
+    return ys, comparisons
+
+
+def dual_pivot_quick_sort(xs, l, h, count, pivots_fn):
+    # recurse on the two smaller parts and loop on the largest part (recursion depth is at most log2(n))
+    while h - l > 1:
+        p, q = pivots_fn(xs, l, h)
+        lt, gt, c = dual_pivot_partition(xs, l, h, p, q)
+        count += c
+        # NOTE: The two pivots are excluded from the recursive calls
+        mid_l, mid_h = lt + 1, gt
+        if xs[lt] == xs[gt]:
+            # the two pivots are equal, so all the elements between them are equal too (and already sorted)
+            mid_l = mid_h = gt
+        elif 7 * (gt - lt - 1) > 4 * (h - l):
+            # a large middle part: if a few probes find duplicates of the pivots (i.e. there are probably many), the
+            # elements equal to either pivot are excluded too
+            c, has_duplicates = probe_pivot_duplicates(xs, lt + 1, gt, xs[lt], xs[gt])
+            count += c
+            if has_duplicates:
+                mid_l, mid_h, c = squeeze_pivots(xs, lt + 1, gt, xs[lt], xs[gt])
+                count += c
+        parts = sorted([(lt - l, l, lt), (mid_h - mid_l, mid_l, mid_h), (h - gt - 1, gt + 1, h)])
+        for _, a, b in parts[:2]:
+            count = dual_pivot_quick_sort(xs, a, b, count, pivots_fn)
+        _, l, h = parts[2]
+    return count
+
+
+# returns the number of comparisons, and whether any of (about) DUPLICATE_PROBES evenly spaced elements of the
+# range(l, h) is equal to one of the pivots lp and rp
+DUPLICATE_PROBES = 5
+
+
+def probe_pivot_duplicates(xs, l, h, lp, rp):
+    count = 0
+    for i in range(l, h, max((h - l) // DUPLICATE_PROBES, 1)):
+        count += 2
+        if not lp < xs[i] or not xs[i] < rp:
+            return count, True
+    return count, False
+
+
+# Quick sort by a key function (decorate-sort-undecorate over parallel arrays)
+# key is a function computing the sort key of every element (computed exactly once per element)
+# reverse sorts in descending order
+# NOTE: The pivot strategy is given the keys (e.g. choose_pivot_median_of_three looks at the keys)
+# NOTE: Quick sort is not stable (use merge_sort with a key if equal elements must keep their order)
+def sort_by_key(xs, key=None, reverse=False, pivot_fn=None):
+    if pivot_fn is None:
+        pivot_fn = lambda zs, l, h: choose_pivot_median_of_three(zs, l, h)
+    vs = xs[:]
+    ks = [key(v) for v in vs] if key is not None else xs[:]
+    comparisons = quick_sort_keyed(ks, vs, 0, len(vs), 0, pivot_fn)
+    if reverse:
+        vs.reverse()
+    return vs, comparisons
+
+
+def quick_sort_keyed(ks, vs, l, h, count, pivot_fn):
+    # recurse on the smaller side and loop on the larger side (recursion depth is at most log2(n))
+    while h - l > 1:
+        pivot_index = pivot_fn(ks, l, h)
+        count += h - l - 1
+        p = partition_keyed(ks, vs, l, h, pivot_index)
+        if p - l < h - p - 1:
+            count = quick_sort_keyed(ks, vs, l, p, count, pivot_fn)
+            l = p + 1
+        else:
+            count = quick_sort_keyed(ks, vs, p + 1, h, count, pivot_fn)
+            h = p
+    return count
+
+
+# Introsort (production quick sort) with the same (sorted, comparisons) return shape as the sort_pivot_* family
+#   * recurse on the smaller side of the partition and loop on the larger side (recursion depth is at most log2(n))
+#   * small ranges (at most INSERTION_SORT_CUTOFF elements) are insertion sorted
+#   * when the partition depth exceeds 2*log2(n) the range is heap sorted (worst case is O(n log n))
+# NOTE: Any pivot strategy can be used, e.g. sort_intro(xs, lambda zs, l, h: l) for the first element strategy
+INSERTION_SORT_CUTOFF = 16
+
+
+def sort_intro(xs, pivot_fn=None):
+    if pivot_fn is None:
+        pivot_fn = lambda zs, l, h: choose_pivot_median_of_three(zs, l, h)
+    ys = xs[:]
+    comparisons = intro_sort(ys, 0, len(ys), 0, pivot_fn, 2 * len(ys).bit_length())
+    return ys, comparisons
+
+
+def intro_sort(xs, l, h, count, pivot_fn, depth_limit):
+    while h - l > INSERTION_SORT_CUTOFF:
+        if depth_limit == 0:
+            return count + heap_sort(xs, l, h)
+        depth_limit -= 1
+        pivot_index = pivot_fn(xs, l, h)
+        count += h - l - 1
+        p = partition(xs, l, h, pivot_index)
+        if p - l < h - p - 1:
+            count = intro_sort(xs, l, p, count, pivot_fn, depth_limit)
+            l = p + 1
+        else:
+            count = intro_sort(xs, p + 1, h, count, pivot_fn, depth_limit)
+            h = p
+    return count + insertion_sort_range(xs, l, h)
+
+
 # < 0  means LT
 # == 0 means EQ
 # > 0 means GT
@@ -68,15 +218,46 @@ def numeric_compare(x, y):
 
 
 def load_list(filename):
+    return load_ints(filename, 'list')
+
+
+# Bulk loader of a file with one integer per line (relative to the directory of this script)
+#   * 'list' returns a plain list (for the sort functions)
+#   * 'array' returns a compact array('q') of signed 64-bit integers (8 bytes per integer)
+#   * 'numpy' returns a NumPy int64 array (parsed by the C parser of NumPy in a single step)
+# NOTE: The file is read in blocks of BLOCK_SIZE bytes, and every block is split and parsed in one go (without a
+#       Python loop per line). The last (possibly partial) line of a block is carried over to the next block.
+BLOCK_SIZE = 1 << 24
+
+
+def load_ints(filename, kind='array'):
+    filepath = data_path(filename)
+    if kind == 'numpy':
+        if np is None:
+            raise ImportError('load_ints(filename, \'numpy\') requires NumPy.')
+        return np.loadtxt(filepath, dtype=np.int64, ndmin=1)
+    if kind == 'list':
+        xs = []
+    elif kind == 'array':
+        xs = array('q')
+    else:
+        raise ValueError(f'Unknown kind {kind}.')
+    with open(filepath, 'rb') as fp:
+        rest = b''
+        while True:
+            block = fp.read(BLOCK_SIZE)
+            if len(block) == 0:
+                break
+            head, _, rest = (rest + block).rpartition(b'\n')
+            xs.extend(map(int, head.split()))
+        xs.extend(map(int, rest.split()))
+    return xs
+
+
+def data_path(filename):
     script_path = os.path.realpath(__file__)
     dir_path = os.path.dirname(script_path)
-    filepath = os.path.join(dir_path, filename)
-    xs = []
-    with open(filepath) as fp:
-        for number, line in enumerate(fp):
-            xs.append(int(line))
-            # print("Line {}: {}".format(number, line))
-    return xs
+    return os.path.join(dir_path, filename)
 
 
 def main():
@@ -98,6 +279,16 @@ def main():
     print(f'The {len(xs)}-element list have been sorted using {c} comparisons with the median element strategy.')
     sorted_xs, c = sort_pivot_randomly(xs)
     print(f'The {len(xs)}-element list have been sorted using {c} comparisons with the random element strategy.')
+    sorted_xs, c = sort_intro(xs)
+    print(f'The {len(xs)}-element list have been sorted using {c} comparisons with the introsort strategy.')
+    sorted_xs, c = sort_three_way(xs)
+    print(f'The {len(xs)}-element list have been sorted using {c} comparisons with the three-way partition strategy.')
+    sorted_xs, c = sort_dual_pivot(xs)
+    print(f'The {len(xs)}-element list have been sorted using {c} comparisons with the dual-pivot strategy.')
+    sorted_xs, c = sort_dual_pivot(xs, lambda zs, l, h: choose_pivots_randomly(l, h))
+    print(f'The {len(xs)}-element list have been sorted using {c} comparisons with the random dual-pivot strategy.')
+    sorted_xs, c = sort_by_key(xs, key=lambda x: -x, reverse=True)
+    print(f'The {len(xs)}-element list have been sorted using {c} comparisons by a (negated) key in reverse order.')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,123 @@
+# standard library imports
+from array import array
+from itertools import repeat
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # NumPy is optional, and only needed for NumPy arrays
+
+# Integer (non-comparison based) sorting in linear time
+#   * counting sort counts the occurrences of every value in the range min..max (for small ranges)
+#   * LSD radix sort performs a stable counting sort pass per byte (digit) of the values, from the least
+#     significant byte to the most significant byte
+# Negative numbers are handled by sorting the offsets from the minimum value (which are never negative).
+# The sorted values are returned in a new container of the same kind (list, array or NumPy array)
+RADIX_BITS = 8
+RADIX = 1 << RADIX_BITS
+MASK = RADIX - 1
+
+
+def counting_sort(xs):
+    if np is not None and isinstance(xs, np.ndarray):
+        return counting_sort_numpy(xs)
+    if len(xs) < 2:
+        return same_kind(xs, list(xs))
+    lo = min(xs)
+    hi = max(xs)
+    counts = [0] * (hi - lo + 1)
+    for x in xs:
+        counts[x - lo] += 1
+    ys = []
+    for v, c in enumerate(counts):
+        if c > 0:
+            ys.extend(repeat(v + lo, c))
+    return same_kind(xs, ys)
+
+
+# NOTE: If the range of the values is at most n, a single counting sort pass is used instead
+def radix_sort(xs):
+    if np is not None and isinstance(xs, np.ndarray):
+        return radix_sort_numpy(xs)
+    n = len(xs)
+    if n < 2:
+        return same_kind(xs, list(xs))
+    lo = min(xs)
+    span = max(xs) - lo
+    if span <= n:
+        return counting_sort(xs)
+    src = [x - lo for x in xs]
+    dst = [0] * n  # the auxiliary buffer (the two lists swap roles after each pass)
+    shift = 0
+    while span >> shift > 0:
+        counts = [0] * RADIX
+        for x in src:
+            counts[(x >> shift) & MASK] += 1
+        if max(counts) < n:
+            # the start index of every digit (exclusive prefix sums of the counts)
+            total = 0
+            for d in range(RADIX):
+                counts[d], total = total, total + counts[d]
+            for x in src:
+                d = (x >> shift) & MASK
+                dst[counts[d]] = x
+                counts[d] += 1
+            src, dst = dst, src
+        # NOTE: if all values have the same digit, the pass would not change the order (and is skipped)
+        shift += RADIX_BITS
+    return same_kind(xs, [x + lo for x in src])
+
+
+def same_kind(xs, ys):
+    if isinstance(xs, array):
+        return array(xs.typecode, ys)
+    return ys
+
+
+#
+# NumPy versions
+#
+
+
+# the offsets from the minimum are computed in uint64 (modulo 2^64), so they never wrap in a narrow dtype (like int8),
+# and they are exact for every integer dtype (including int64 and uint64)
+def offsets_numpy(xs):
+    lo = xs.min().astype(np.uint64)
+    return xs.astype(np.uint64) - lo, lo
+
+
+def counting_sort_numpy(xs):
+    if len(xs) < 2:
+        return xs.copy()
+    offsets, lo = offsets_numpy(xs)
+    counts = np.bincount(offsets.astype(np.intp))
+    return (np.repeat(np.arange(len(counts), dtype=np.uint64), counts) + lo).astype(xs.dtype)
+
+
+# every pass is a stable sort of the bytes (NumPy uses a radix sort for stable sorting of 8-bit integers)
+def radix_sort_numpy(xs):
+    n = len(xs)
+    if n < 2:
+        return xs.copy()
+    lo = int(xs.min())
+    span = int(xs.max()) - lo
+    if span <= n:
+        return counting_sort_numpy(xs)
+    keys, lo = offsets_numpy(xs)
+    shift = 0
+    while span >> shift > 0:
+        digits = ((keys >> np.uint64(shift)) & np.uint64(MASK)).astype(np.uint8)
+        keys = keys[np.argsort(digits, kind='stable')]
+        shift += RADIX_BITS
+    return (keys + lo).astype(xs.dtype)
+
+
+def main():
+    xs = [3, -5, 7, 2, 8, -1, 4, 6, 1000000]
+    print(f'{xs} sorted using radix sort is {radix_sort(xs)}')
+    ys = [3, 1, 2, 3, 1, 2, 0]
+    print(f'{ys} sorted using counting sort is {counting_sort(ys)}')
+
+
+if __name__ == '__main__':
+    main()